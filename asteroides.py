@@ -1,7 +1,22 @@
+import os
+import argparse
+import atexit
+import collections
+import contextlib
+import csv
 import pygame
+import numpy as np
 import sys
+import time
 import math
+import functools
+import io
+import queue
 import random
+import struct
+import threading
+import concurrent.futures
+import zlib
 
 # =========================
 # CONFIGURAÇÕES
@@ -10,30 +25,29 @@ WIDTH, HEIGHT = 640, 480
 VIEWPORT = pygame.Rect(40, 40, 560, 400)
 FPS = 60
 
-pygame.init()
+# Importar o módulo não abre janela nem toca som: tela, fontes, relógio e música
+# são criados por init(), chamado pelo main() (ou por quem for usar as primitivas).
+screen = None
+canvas = None
+clock = None
+fonte_titulo = None
+fonte_instrucao = None
 
-fonte_titulo = pygame.font.SysFont("arial", 42, bold=True)
-fonte_instrucao = pygame.font.SysFont("arial", 24)
-
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Nave vs Asteroides - CG")
-clock = pygame.time.Clock()
 
 # =========================
-# MÚSICA E SONS
+# Textos
 # =========================
+# As superfícies de texto ficam num cache LRU: menus e telas redesenham os mesmos textos todo quadro,
+# então o font.render só roda na primeira vez de cada (texto, fonte, cor, antialias).
+TEXT_CACHE_SIZE = 256
 
-pygame.mixer.music.load("Sounds/The_Astronaut.mp3")   # música de fundo
-pygame.mixer.music.set_volume(0.5)
-pygame.mixer.music.play(-1)             # loop infinito
-
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text, font, color, antialias=True):
+    # coloca o texto na superfície e deixa o conjunto de pixel que forma a letra mais "liso", pra dá efeito de continuidade
+    return font.render(text, antialias, color)
 
-# =========================
-# Textos
-# =========================
 def draw_text(text, font, color, x, y, center=True):
-    # coloca o texto na superfície e deixa o conjunto de pixel que forma a letra mais "liso", pra dá efeito de continuidade
-    surface = font.render(text, True, color)
+    surface = render_text(text, font, color)
     # Cria um retângulo delimitador (bounding box) da surpefície criada
     rect = surface.get_rect()
     #centraliza na posição dada
@@ -54,13 +68,160 @@ GRAY  = (160,160,160)
 BLUE  = (80,160,255)
 YELLOW = (255,255,0)
 
+# =========================
+# CANVAS (FRAMEBUFFER)
+# =========================
+class Canvas:
+    # Alvo de renderização das primitivas. Em vez de chamar screen.set_at pixel a pixel,
+    # a superfície é travada uma vez e os pixels são escritos direto num array (x, y) do NumPy.
+    def __init__(self, surface):
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        # retângulo de recorte ativo [x0, x1) x [y0, y1): a superfície toda, uma faixa (BandCanvas)
+        # ou o que clipped() definir; as primitivas recortam contra ele antes de rasterizar
+        self.x0, self.x1 = 0, self.width
+        self.y0, self.y1 = 0, self.height
+        self.pixels = None
+        self._travas = 0
+        self._cores = {}
+        self._padroes = {}
+        # contadores de pixels escritos e lidos (usados pelo profiler)
+        self.escritos = 0
+        self.lidos = 0
+
+    # "with canvas:" trava a superfície; chamadas aninhadas reaproveitam o mesmo array
+    def __enter__(self):
+        if self._travas == 0:
+            self.pixels = pygame.surfarray.pixels2d(self.surface)
+        self._travas += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._travas -= 1
+        if self._travas == 0:
+            # soltar a referência do array destrava a superfície (necessário antes de blit/flip)
+            self.pixels = None
+        return False
+
+    @contextlib.contextmanager
+    def clipped(self, rect):
+        # restringe a escrita ao retângulo (x, y, largura, altura) enquanto o with durar
+        anterior = (self.x0, self.y0, self.x1, self.y1)
+        self.x0, self.y0 = max(self.x0, rect[0]), max(self.y0, rect[1])
+        self.x1, self.y1 = min(self.x1, rect[0] + rect[2]), min(self.y1, rect[1] + rect[3])
+        try:
+            yield self
+        finally:
+            self.x0, self.y0, self.x1, self.y1 = anterior
+
+    def clip_box(self):
+        # o recorte ativo com bordas inclusivas (xmin, ymin, xmax, ymax)
+        return self.x0, self.y0, self.x1 - 1, self.y1 - 1
+
+    def box_inside(self, xmin, ymin, xmax, ymax):
+        return self.x0 <= xmin and xmax < self.x1 and self.y0 <= ymin and ymax < self.y1
+
+    def box_outside(self, xmin, ymin, xmax, ymax):
+        return xmax < self.x0 or xmin >= self.x1 or ymax < self.y0 or ymin >= self.y1
+
+    def map_color(self, color):
+        # converte (r, g, b) para o inteiro no formato de pixel da superfície (com cache)
+        mapped = self._cores.get(color)
+        if mapped is None:
+            mapped = self._cores[color] = self.surface.map_rgb(color)
+        return mapped
+
+    def set_pixel(self, x, y, color):
+        # verifica se as coordenadas passadas são válidas, se forem, pinta o pixel
+        if self.x0 <= x < self.x1 and self.y0 <= y < self.y1:
+            with self:
+                self.pixels[x, y] = self.map_color(color)
+            self.escritos += 1
+
+    def set_pixels(self, xs, ys, color):
+        # escrita em lote: pinta todas as coordenadas (xs[i], ys[i]) de uma vez só, descartando as de fora do recorte
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        dentro = (xs >= self.x0) & (xs < self.x1) & (ys >= self.y0) & (ys < self.y1)
+        with self:
+            self.pixels[xs[dentro], ys[dentro]] = self.map_color(color)
+        self.escritos += int(np.count_nonzero(dentro))
+
+    def put_pixels(self, xs, ys, color):
+        # como set_pixels, mas sem checagem: quem chama já recortou (todas as coordenadas estão dentro)
+        with self:
+            self.pixels[xs, ys] = self.map_color(color)
+        self.escritos += len(xs)
+
+    def fill_rect(self, rect, color):
+        # preenche um retângulo (x, y, largura, altura) recortado à superfície
+        x0, y0 = max(rect[0], self.x0), max(rect[1], self.y0)
+        x1 = min(rect[0] + rect[2], self.x1)
+        y1 = min(rect[1] + rect[3], self.y1)
+        if x0 < x1 and y0 < y1:
+            with self:
+                self.pixels[x0:x1, y0:y1] = self.map_color(color)
+            self.escritos += (x1 - x0) * (y1 - y0)
+
+    def copy_from_at(self, array, x, y):
+        # copia um array de pixels inteiro (ex.: uma textura fora da tela) com o canto em (x, y)
+        w, h = array.shape
+        x0, y0 = max(x, self.x0), max(y, self.y0)
+        x1, y1 = min(x + w, self.x1), min(y + h, self.y1)
+        if x0 < x1 and y0 < y1:
+            with self:
+                self.pixels[x0:x1, y0:y1] = array[x0 - x:x1 - x, y0 - y:y1 - y]
+            self.escritos += (x1 - x0) * (y1 - y0)
+
+    def stamp(self, sprite, x, y):
+        # cola um sprite com o canto em (x, y) usando cor-chave: pixels opacos sempre entram,
+        # pixels de preenchimento só entram onde o canvas ainda está com a cor de fundo
+        w, h = sprite.pixels.shape
+        x0, y0 = max(x, self.x0), max(y, self.y0)
+        x1, y1 = min(x + w, self.x1), min(y + h, self.y1)
+        if x0 < x1 and y0 < y1:
+            fatia = (slice(x0 - x, x1 - x), slice(y0 - y, y1 - y))
+            with self:
+                regiao = self.pixels[x0:x1, y0:y1]
+                mascara = sprite.opaco[fatia] | (sprite.fundo[fatia] & (regiao == sprite.chave))
+                regiao[mascara] = sprite.pixels[fatia][mascara]
+            self.escritos += int(np.count_nonzero(mascara))
+            self.lidos += (x1 - x0) * (y1 - y0)
+
+    def pattern_row(self, cores):
+        # linha pré-calculada com as cores do padrão alternadas (cor0, cor1, cor0, ...);
+        # um trecho começando em x usa a fatia que começa no deslocamento (x + y) % len(cores)
+        linha = self._padroes.get(cores)
+        if linha is None:
+            linha = np.empty(self.width + len(cores), dtype=np.uint32)
+            for i, cor in enumerate(cores):
+                linha[i::len(cores)] = self.map_color(cor)
+            self._padroes[cores] = linha
+        return linha
+
+
+class BandCanvas(Canvas):
+    # Faixa horizontal [y0, y1) de outro canvas: mesmo array e mesmas coordenadas, mas só
+    # escreve nas próprias linhas. Faixas diferentes podem ser desenhadas ao mesmo tempo.
+    def __init__(self, pai, y0, y1):
+        self.surface = pai.surface
+        self.width, self.height = pai.width, pai.height
+        self.x0, self.x1 = pai.x0, pai.x1
+        self.y0, self.y1 = max(y0, pai.y0), min(y1, pai.y1)
+        self.pixels = pai.pixels
+        self._travas = 1   # o pai fica travado enquanto as faixas desenham
+        self._cores = pai._cores
+        self._padroes = pai._padroes
+        self.escritos = 0
+        self.lidos = 0
+
+
 # =========================
 # SET PIXEL
 # =========================
-def set_pixel(x, y, color):
-    # verifica se as coordenadas passadas são válidas, se forem, pinta o pixel na tela de acordo com a coordenada dada
-    if 0 <= x < WIDTH and 0 <= y < HEIGHT:
-        screen.set_at((x, y), color)
+def set_pixel(x, y, color, alvo=None):
+    # mantido por compatibilidade: pinta um único pixel no canvas (por padrão, a tela)
+    (alvo or canvas).set_pixel(x, y, color)
 
 
 # ===================================================
@@ -69,7 +230,14 @@ def set_pixel(x, y, color):
 
 # LINHA - BRESENHAM
 
-def draw_line(x0, y0, x1, y1, color):
+def draw_line(x0, y0, x1, y1, color, alvo=None):
+    # recorte pela caixa envolvente: fora do recorte não rasteriza nada; dentro, escreve sem checar pixel a pixel
+    alvo = alvo or canvas
+    caixa = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+    if alvo.box_outside(*caixa):
+        return
+    escrever = alvo.put_pixels if alvo.box_inside(*caixa) else alvo.set_pixels
+
     # calcula a distância horizontal e vertical("tamanho"), a relação dy/dx define o comportamento da linha(inclinação)
     dx = abs(x1-x0)
     dy = abs(y1-y0)
@@ -79,9 +247,12 @@ def draw_line(x0, y0, x1, y1, color):
     sy = 1 if y0 < y1 else -1
     #mede se é para descer ou subir(saldo inicial)
     err = dx - dy
+    # os pixels são acumulados e escritos de uma vez no canvas no final
+    xs, ys = [], []
 
     while True:
-        set_pixel(x0, y0, color)
+        xs.append(x0)
+        ys.append(y0)
         #verificando se não se mexeu, é só um pixel porque as coordenadas são iguais
         if x0 == x1 and y0 == y1:
             break
@@ -93,20 +264,124 @@ def draw_line(x0, y0, x1, y1, color):
         if e2 < dx:
             err += dx
             y0 += sy
+    escrever(np.array(xs, dtype=np.intp), np.array(ys, dtype=np.intp), color)
+
+
+# VÁRIAS LINHAS DE UMA VEZ - BRESENHAM VETORIZADO
+
+def line_pixels(segments, recorte=None):
+    # Gera os pixels de todos os segmentos (x0, y0, x1, y1) numa única passada do NumPy.
+    # O Bresenham acima tem forma fechada: o eixo maior (n = max(dx, dy)) anda 1 pixel por passo
+    # e o eixo menor anda floor((2*i*m + n - 1) / (2*n)) no passo i, com o mesmo desempate do laço.
+    # recorte (xmin, ymin, xmax, ymax, inclusivos): só gera os passos que caem dentro dele.
+    seg = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    if len(seg) == 0:
+        vazio = np.empty(0, dtype=np.intp)
+        return vazio, vazio
+    x0, y0, x1, y1 = seg.T
+    dx = np.abs(x1 - x0)
+    dy = np.abs(y1 - y0)
+    sx = np.where(x0 < x1, 1, -1)
+    sy = np.where(y0 < y1, 1, -1)
+    n = np.maximum(dx, dy)
+
+    # índice do passo i de cada pixel dentro do seu segmento
+    if recorte is None:
+        primeiro, qtd = np.zeros_like(n), n + 1
+    else:
+        primeiro, ultimo = clip_steps(x0, y0, dx, dy, sx, sy, n, recorte)
+        qtd = np.maximum(ultimo - primeiro + 1, 0)
+    inicio = np.cumsum(qtd) - qtd
+    idx = np.repeat(np.arange(len(seg)), qtd)
+    i = np.arange(qtd.sum()) - inicio[idx] + primeiro[idx]
+
+    n_i = np.maximum(n[idx], 1)
+    x_maior = (dx >= dy)[idx]
+    # deslocamento no eixo menor (o eixo maior é o próprio i)
+    menor = (2 * i * np.where(x_maior, dy[idx], dx[idx]) + n_i - 1) // (2 * n_i)
+    xs = x0[idx] + sx[idx] * np.where(x_maior, i, menor)
+    ys = y0[idx] + sy[idx] * np.where(x_maior, menor, i)
+    return xs, ys
+
+
+def clip_steps(x0, y0, dx, dy, sx, sy, n, recorte):
+    # Recorte de vários segmentos de uma vez, no espaço dos passos: para cada segmento, o intervalo
+    # [primeiro, ultimo] de passos i cujo pixel cai dentro do recorte. Como cada eixo anda de forma
+    # monótona, cada limite do retângulo vira um limite em i (conta inteira, sem ponto flutuante),
+    # e os pixels que sobram são exatamente os da linha inteira que estão dentro do retângulo.
+    xmin, ymin, xmax, ymax = recorte
+    x_maior = dx >= dy
+    a0, b0 = np.where(x_maior, x0, y0), np.where(x_maior, y0, x0)
+    sa, sb = np.where(x_maior, sx, sy), np.where(x_maior, sy, sx)
+    a_min, a_max = np.where(x_maior, xmin, ymin), np.where(x_maior, xmax, ymax)
+    b_min, b_max = np.where(x_maior, ymin, xmin), np.where(x_maior, ymax, xmax)
+    m = np.where(x_maior, dy, dx)
+
+    # eixo maior: a0 + sa*i dentro de [a_min, a_max]
+    primeiro = np.maximum(0, np.where(sa > 0, a_min - a0, a0 - a_max))
+    ultimo = np.minimum(n, np.where(sa > 0, a_max - a0, a0 - a_min))
+
+    # eixo menor: o deslocamento k(i) = floor((2*i*m + n - 1) / (2*n)) precisa ficar em [k_min, k_max];
+    # k(i) >= k  <=>  i >= ceil((2*n*k - n + 1) / (2*m))
+    k_min = np.where(sb > 0, b_min - b0, b0 - b_max)
+    k_max = np.where(sb > 0, b_max - b0, b0 - b_min)
+    m2 = 2 * np.maximum(m, 1)
+    desde = -((n - 1 - 2 * n * k_min) // m2)
+    ate = -((n - 1 - 2 * n * (k_max + 1)) // m2) - 1
+    # m == 0: o eixo menor não anda (k = 0 em todo passo)
+    parado = m == 0
+    desde = np.where(parado, np.where((k_min <= 0) & (k_max >= 0), 0, n + 1), desde)
+    ate = np.where(parado, n, ate)
+    return np.maximum(primeiro, desde), np.minimum(ultimo, ate)
+
+
+def draw_lines(segments, color, alvo=None):
+    # desenha uma lista/array de segmentos (x0, y0, x1, y1) com uma única escrita no canvas;
+    # os segmentos são recortados antes, então a escrita não precisa checar cada pixel
+    alvo = alvo or canvas
+    seg = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    if len(seg) == 0:
+        return
+    # lote todo dentro do recorte (o caso comum): nem precisa recortar segmento por segmento
+    recorte = alvo.clip_box()
+    pontos_x, pontos_y = seg[:, 0::2], seg[:, 1::2]
+    if alvo.box_inside(pontos_x.min(), pontos_y.min(), pontos_x.max(), pontos_y.max()):
+        recorte = None
+    xs, ys = line_pixels(seg, recorte)
+    alvo.put_pixels(xs, ys, color)
+
+
+# CÍRCULO E ELIPSE - TABELAS DE DESLOCAMENTOS EM CACHE
+# O formato só depende do raio, então o ponto médio roda uma vez por raio e o resultado
+# (deslocamentos dx, dy sem repetição) fica num cache LRU. Desenhar vira só transladar a tabela.
+CACHE_CIRCULOS = 64   # máximo de raios diferentes guardados
+CACHE_ELIPSES = 32    # máximo de pares (rx, ry) guardados
+
+
+def _tabela(xs, ys):
+    # remove pixels repetidos (pontos de simetria coincidentes) e congela os arrays
+    pares = np.unique(np.stack([np.asarray(xs, dtype=np.intp), np.asarray(ys, dtype=np.intp)], axis=1), axis=0)
+    dx, dy = pares[:, 0].copy(), pares[:, 1].copy()
+    dx.flags.writeable = False
+    dy.flags.writeable = False
+    return dx, dy
 
 
 # CÍRCULO
 
-def draw_circle(cx, cy, r, color):
+@functools.lru_cache(maxsize=CACHE_CIRCULOS)
+def circle_offsets(r):
     #inicializa os valores no topo do círculo para facilitar a simetria
     x, y = 0, r
+    xs, ys = [], []
     # parâmetro de decisão que indica se o próximo pixel escolhido estará dentro ou fora da circunferência ideal.
     d = 1 - r
     while x <= y:
-        # A partir de um único ponto (x, y), o algoritmo desenha 8 pontos equivalentes ao redor do centro (cx, cy) - por causa da simetria
+        # A partir de um único ponto (x, y), o algoritmo gera 8 pontos equivalentes ao redor do centro - por causa da simetria
         for dx, dy in [(x,y),(y,x),(-x,y),(-y,x),
                        (x,-y),(y,-x),(-x,-y),(-y,-x)]:
-            set_pixel(cx+dx, cy+dy, color)
+            xs.append(dx)
+            ys.append(dy)
         #verificando se ainda tá dentro da circunferencia, caso esteja, avança em x
         if d < 0:
             d += 2*x + 3
@@ -115,140 +390,249 @@ def draw_circle(cx, cy, r, color):
             d += 2*(x-y) + 5
             y -= 1
         x += 1
+    return _tabela(xs, ys)
+
+
+def stamp_offsets(cx, cy, dx, dy, rx, ry, color, alvo=None):
+    # carimba uma tabela de deslocamentos com recorte pela caixa envolvente (cx ± rx, cy ± ry):
+    # fora inteira não desenha nada, dentro inteira escreve sem checar cada pixel
+    alvo = alvo or canvas
+    caixa = (cx - rx, cy - ry, cx + rx, cy + ry)
+    if alvo.box_outside(*caixa):
+        return
+    if alvo.box_inside(*caixa):
+        alvo.put_pixels(cx + dx, cy + dy, color)
+    else:
+        alvo.set_pixels(cx + dx, cy + dy, color)
+
+
+def draw_circle(cx, cy, r, color, alvo=None):
+    dx, dy = circle_offsets(r)
+    stamp_offsets(cx, cy, dx, dy, r, r, color, alvo)
 
 #ELIPSE
-def draw_ellipse(cx, cy, rx, ry, color):
+@functools.lru_cache(maxsize=CACHE_ELIPSES)
+def ellipse_offsets(rx, ry):
+    # Versão só com inteiros do ponto médio: os parâmetros de decisão são multiplicados por 4,
+    # assim o 0.25 e o 0.5 somem e a tabela guardada é exata (mesmo sinal em todo passo).
+    rx2, ry2 = rx * rx, ry * ry
     #inicializa na parte superior
     x, y = 0, ry
-    # parametro de decisão da região 1 - verifica se tá dentro ou fora da elipse
-    d1 = (ry**2) - (rx**2 * ry) + (0.25 * rx**2)
-    dx = 2 * ry**2 * x
-    dy = 2 * rx**2 * y
+    xs, ys = [], []
+    # parametro de decisão da região 1 (x4) - verifica se tá dentro ou fora da elipse
+    d1 = 4 * ry2 - 4 * rx2 * ry + rx2
+    dx = 2 * ry2 * x
+    dy = 2 * rx2 * y
     # existe 2 regiões porque a elipse não cresce de maneira uniforme
     # Região 1 - O avanço principal é em X
     while dx < dy:
         #simetria da elipse - ela cresce em 4 quadrantes, ou seja, um único cálculo gera 4 pixels
         for dx_sym, dy_sym in [(x, y), (-x, y), (x, -y), (-x, -y)]:
-            set_pixel(cx + dx_sym, cy + dy_sym, color)
+            xs.append(dx_sym)
+            ys.append(dy_sym)
         if d1 < 0:
             x += 1
-            dx += 2 * ry**2
-            d1 += dx + ry**2
+            dx += 2 * ry2
+            d1 += 4 * (dx + ry2)
         else:
             x += 1
             y -= 1
-            dx += 2 * ry**2
-            dy -= 2 * rx**2
-            d1 += dx - dy + ry**2
+            dx += 2 * ry2
+            dy -= 2 * rx2
+            d1 += 4 * (dx - dy + ry2)
 
-    # Região 2 - O avanço principal é em y
-    d2 = ((ry**2) * ((x + 0.5)**2)) + ((rx**2) * ((y - 1)**2)) - (rx**2 * ry**2)
+    # Região 2 - O avanço principal é em y (x4: ry²(x + 0.5)² vira ry²(2x + 1)²)
+    d2 = ry2 * (2 * x + 1) ** 2 + 4 * rx2 * (y - 1) ** 2 - 4 * rx2 * ry2
     while y >= 0:
         #simetria da elipse - ela cresce em 4 quadrantes, ou seja, um único cálculo gera 4 pixels
         for dx_sym, dy_sym in [(x, y), (-x, y), (x, -y), (-x, -y)]:
-            set_pixel(cx + dx_sym, cy + dy_sym, color)
+            xs.append(dx_sym)
+            ys.append(dy_sym)
         if d2 > 0:
             y -= 1
-            dy -= 2 * rx**2
-            d2 += rx**2 - dy
+            dy -= 2 * rx2
+            d2 += 4 * (rx2 - dy)
         else:
             y -= 1
             x += 1
-            dx += 2 * ry**2
-            dy -= 2 * rx**2
-            d2 += dx - dy + rx**2
+            dx += 2 * ry2
+            dy -= 2 * rx2
+            d2 += 4 * (dx - dy + rx2)
+    return _tabela(xs, ys)
+
+
+def draw_ellipse(cx, cy, rx, ry, color, alvo=None):
+    dx, dy = ellipse_offsets(rx, ry)
+    stamp_offsets(cx, cy, dx, dy, rx, ry, color, alvo)
 
 
 # ==============================================================
 # Preenchimento de Regiões (Flood Fill/Boundary Fill e Scanline)
 # ==============================================================
 
+# PREENCHIMENTO POR SPANS (scanline seed fill)
+# Em vez de empilhar os 4 vizinhos de cada pixel, pinta de uma vez o trecho horizontal (span)
+# inteiro que contém a semente e empilha só uma semente por trecho nas linhas de cima e de baixo.
+# O resultado é o mesmo do preenchimento 4-conectado pixel a pixel.
+
+def span_fill(x, y, dentro, color, alvo=None, max_area=None):
+    # dentro(valores) recebe pixels já mapeados e diz quais pertencem à região a ser pintada.
+    # max_area limita quantos pixels podem ser pintados (proteção contra vazamento); devolve a área pintada.
+    alvo = alvo or canvas
+    x0, x1, y0, y1 = alvo.x0, alvo.x1, alvo.y0, alvo.y1
+    if not (x0 <= x < x1 and y0 <= y < y1):
+        return 0
+    cor = alvo.map_color(color)
+    area = 0
+    with alvo:
+        pixels = alvo.pixels
+        stack = [(x, y)]
+        while stack:
+            sx, sy = stack.pop()
+            # só a parte da linha dentro do recorte (linha[i] é o pixel x0 + i)
+            linha = pixels[x0:x1, sy]
+            # a semente pode ter sido pintada por outro span depois de empilhada
+            if not dentro(linha[sx - x0]):
+                continue
+            # estende o span para a esquerda e para a direita até sair da região
+            fora = ~dentro(linha)
+            alvo.lidos += x1 - x0
+            esquerda = np.flatnonzero(fora[:sx - x0])
+            direita = np.flatnonzero(fora[sx - x0:])
+            xl = x0 + esquerda[-1] + 1 if len(esquerda) else x0
+            xr = sx + direita[0] - 1 if len(direita) else x1 - 1
+            if max_area is not None and area + (xr - xl + 1) > max_area:
+                break
+            linha[xl - x0:xr - x0 + 1] = cor
+            area += xr - xl + 1
+            alvo.escritos += xr - xl + 1
+            # uma semente por trecho contínuo da região nas linhas vizinhas (4-conectado)
+            for ny in (sy - 1, sy + 1):
+                if y0 <= ny < y1:
+                    m = dentro(pixels[xl:xr + 1, ny])
+                    alvo.lidos += xr - xl + 1
+                    inicios = np.flatnonzero(m[1:] & ~m[:-1]) + 1
+                    if m[0]:
+                        stack.append((xl, ny))
+                    stack.extend((xl + int(i), ny) for i in inicios)
+    return area
+
+
 # FLOOD FILL - preenchimento de área
 
-def flood_fill(x, y, target, replacement):
+def flood_fill(x, y, target, replacement, alvo=None, max_area=None):
     # Se a cor de destino já for igual à nova cor, não há o que preencher.
     if target == replacement:
-        return
-    # A pilha armazena os pixels que ainda precisam ser processados
-    stack = [(x,y)]
-    while stack:
-        #retirada de um pixel da pilha
-        px, py = stack.pop()
-        if 0 <= px < WIDTH and 0 <= py < HEIGHT:
-            #Verifica se o pixel pertence à região a ser preenchida.
-            if screen.get_at((px,py))[:3] == target:
-                set_pixel(px,py,replacement)
-                #adiciona os 4 vizinhos na pilha
-                stack.extend([
-                    (px+1,py),(px-1,py),
-                    (px,py+1),(px,py-1)
-                ])
+        return 0
+    cor_alvo = (alvo or canvas).map_color(target)
+    #pinta todos os pixels com a cor de destino conectados à semente
+    return span_fill(x, y, lambda v: v == cor_alvo, replacement, alvo, max_area)
 
 
 # BOUNDARY FILL - Muito usado quando: a região tem contorno bem definido e o interior pode ter cores variadas
 
-def boundary_fill(x, y, fill_color, boundary_color):
-    # Usamos uma pilha (stack) para evitar erro de recursão do Python
-    stack = [(x, y)]
-    
-    while stack:
-        px, py = stack.pop()
-        
-        if 0 <= px < WIDTH and 0 <= py < HEIGHT:
-            current_color = screen.get_at((px, py))[:3]
-            
-            # Se a cor atual não é a fronteira E ainda não é a cor de preenchimento
-            if current_color != boundary_color and current_color != fill_color:
-                set_pixel(px, py, fill_color)
-                
-                # Adiciona vizinhos na pilha (4-conectado)
-                stack.append((px + 1, py))
-                stack.append((px - 1, py))
-                stack.append((px, py + 1))
-                stack.append((px, py - 1))
-
-
-
-# SCANLINE
-
-def scanline_fill(points, fill_color):
+def boundary_fill(x, y, fill_color, boundary_color, alvo=None, max_area=None):
+    cor_fill = (alvo or canvas).map_color(fill_color)
+    cor_borda = (alvo or canvas).map_color(boundary_color)
+    # Se a cor atual não é a fronteira E ainda não é a cor de preenchimento, faz parte da região
+    return span_fill(x, y, lambda v: (v != cor_borda) & (v != cor_fill), fill_color, alvo, max_area)
+
+
+
+# ELIPSE PREENCHIDA POR SPANS
+# Para uma elipse isolada, o interior que o flood fill a partir do centro pintaria é, em cada linha,
+# o trecho entre o pixel mais à esquerda e o mais à direita do contorno. Não precisa de semente,
+# então funciona mesmo com o centro fora do canvas.
+
+@functools.lru_cache(maxsize=CACHE_ELIPSES)
+def ellipse_rows(rx, ry):
+    # para cada linha dy (de -ry a ry), o menor e o maior dx do contorno
+    dx, dy = ellipse_offsets(rx, ry)
+    xmin = np.zeros(2 * ry + 1, dtype=np.intp)
+    xmax = np.zeros(2 * ry + 1, dtype=np.intp)
+    np.minimum.at(xmin, dy + ry, dx)
+    np.maximum.at(xmax, dy + ry, dx)
+    return xmin, xmax
+
+def fill_ellipse(cx, cy, rx, ry, fill_color, outline_color, alvo=None):
+    alvo = alvo or canvas
+    xmin, xmax = ellipse_rows(rx, ry)
+    cor = alvo.map_color(fill_color)
+    if alvo.box_outside(cx - rx, cy - ry, cx + rx, cy + ry):
+        return
+    with alvo:
+        # só as linhas dentro do recorte; cada trecho é cortado nas bordas x do recorte
+        for dy in range(max(-ry, alvo.y0 - cy), min(ry, alvo.y1 - 1 - cy) + 1):
+            y = cy + dy
+            x0, x1 = max(cx + int(xmin[dy + ry]) + 1, alvo.x0), min(cx + int(xmax[dy + ry]), alvo.x1)
+            if x0 < x1:
+                alvo.pixels[x0:x1, y] = cor
+                alvo.escritos += x1 - x0
+        draw_ellipse(cx, cy, rx, ry, outline_color, alvo)
+
+
+# SCANLINE - TABELA DE ARESTAS (ET) E TABELA DE ARESTAS ATIVAS (AET)
+XADREZ_AZUL = ((0, 0, 255), (0, 0, 180))   # textura padrão da nave
+
+def scanline_fill(points, fill_color, alvo=None, pattern=XADREZ_AZUL):
+    # pattern: cores alternadas em xadrez ((x + y) % n escolhe a cor); None pinta só com fill_color
     #verificando se é um polígono
     if len(points) < 3: return
 
-    # 1. Encontrar limites verticais - todos os ys
+    alvo = alvo or canvas
+    # 1. Encontrar limites verticais - todos os ys; o polígono fora do recorte nem é percorrido
     ys = [p[1] for p in points]
     min_y, max_y = int(min(ys)), int(max(ys))
+    xs = [p[0] for p in points]
+    if alvo.box_outside(min(xs), min_y, max(xs), max_y):
+        return
+    # as linhas fora do recorte são puladas: cada aresta já entra com o x da primeira linha visível
+    min_y, max_y = max(min_y, alvo.y0), min(max_y, alvo.y1 - 1)
 
-    # 2. Iterar por cada linha horizontal
-    for y in range(min_y, max_y + 1):
-        # Guarda todos os valores de X onde a scanline cruza as arestas
-        intersections = []
-        for i in range(len(points)):
-            p1 = points[i]
-            p2 = points[(i + 1) % len(points)]
-            
-            # Verifica se a scanline intercepta a aresta
-            if (p1[1] <= y < p2[1]) or (p2[1] <= y < p1[1]):
-                # Cálculo de X da interseção (Interpolação)
-                x = p1[0] + (y - p1[1]) * (p2[0] - p1[0]) / (p2[1] - p1[1]) #equação da reta
-                intersections.append(int(x))
-        
-        # 3. ORDENAR as interseções 
-        intersections.sort()
-        
-        # 4. Preencher entre os pares (A-B, C-D...)
-        for i in range(0, len(intersections), 2):
-            if i + 1 < len(intersections):
-                x_start = intersections[i]
-                x_end = intersections[i+1]
-                
-                # LAÇO DE TEXTURA: Em vez de draw_line, pintamos pixel a pixel, cria um padrão tipo xadrez
-                for x in range(x_start, x_end + 1):
-
-                    if (x // 1 + y // 1) % 2 == 0:
-                        set_pixel(x, y, (0, 0, 255))    
-                    else:
-                        set_pixel(x, y, (0, 0, 180))
+    # 2. Tabela de arestas: cada aresta não horizontal entra na linha em que começa.
+    # A aresta vale para min(y1, y2) <= y < max(y1, y2), igual ao teste da versão antiga.
+    tabela = {}
+    for i in range(len(points)):
+        p1 = points[i]
+        p2 = points[(i + 1) % len(points)]
+        if p1[1] == p2[1]:
+            continue
+        inicio = max(math.ceil(min(p1[1], p2[1])), min_y)
+        fim = max(p1[1], p2[1])
+        dx = p2[0] - p1[0]
+        # x = p1x + num / dy, com num = (y - p1y) * dx avançando de dx a cada linha (inteiro exato)
+        tabela.setdefault(inicio, []).append([fim, p1[0], (inicio - p1[1]) * dx, dx, p2[1] - p1[1]])
+
+    if pattern is None:
+        pattern = (fill_color,)
+    linha_padrao = alvo.pattern_row(pattern)
+    n_cores = len(pattern)
+
+    ativas = []
+    with alvo:
+        pixels = alvo.pixels
+        # 3. Iterar por cada linha horizontal
+        for y in range(min_y, max_y + 1):
+            # tira as arestas que já acabaram e entra com as que começam nesta linha
+            ativas = [a for a in ativas if y < a[0]]
+            ativas.extend(a for a in tabela.get(y, ()) if y < a[0])
+            if not ativas:
+                continue
+
+            # 4. Interseções já ordenadas, pegando o x de cada aresta ativa
+            intersections = sorted(int(a[1] + a[2] / a[4]) for a in ativas)
+            for a in ativas:
+                a[2] += a[3]
+
+            # 5. Preencher entre os pares (A-B, C-D...) com uma fatia do padrão por trecho
+            for i in range(0, len(intersections) - 1, 2):
+                x_start = max(intersections[i], alvo.x0)
+                x_end = min(intersections[i+1], alvo.x1 - 1)
+                if x_start > x_end:
+                    continue
+                desloc = (x_start + y) % n_cores
+                pixels[x_start:x_end + 1, y] = linha_padrao[desloc:desloc + x_end - x_start + 1]
+                alvo.escritos += x_end - x_start + 1
 
 
 
@@ -258,24 +642,22 @@ def scanline_fill(points, fill_color):
 
 # Intro
 def intro_logo():
-    # Carrega e toca a música da INTRO
-    pygame.mixer.music.load("Sounds/capcom.mp3") 
-    pygame.mixer.music.set_volume(0.5)
-    pygame.mixer.music.play(-1) 
+    # Toca a música da INTRO (começa assim que o preloader terminar de ler o arquivo)
+    assets.play_music("capcom.mp3")
 
     start = pygame.time.get_ticks()
 
     while True:
         clock.tick(60)
+        assets.update()
         screen.fill(BLACK)
         draw_logo()
         pygame.display.flip()
 
         # Verifica se o tempo acabou (6 segundos)
         if pygame.time.get_ticks() - start > 6000:
-            # ANTES DE SAIR: Carrega a música principal do JOGO
-            pygame.mixer.music.load("Sounds/The_Astronaut.mp3")
-            pygame.mixer.music.play(-1)
+            # ANTES DE SAIR: troca para a música principal do JOGO (já está em memória)
+            assets.play_music("The_Astronaut.mp3")
             return
 
         for event in pygame.event.get():
@@ -296,52 +678,60 @@ def draw_logo():
         # Pequena flutuação
         offset_y = int(math.sin(tempo_atual * 0.005) * 7)
         angle = pygame.time.get_ticks() * 0.05
-        desenhar_nave_detalhada(cx, cy + offset_y, angle)
+        draw_detailed_ship(cx, cy + offset_y, angle)
 
 
-def instructions():
-    scrolling_story()
+# TELAS PARADAS
+# Menu, instruções e fim de jogo não têm animação: são desenhadas uma vez e o programa dorme
+# em pygame.event.wait até chegar uma tecla, em vez de redesenhar a tela sem parar.
+MENU_FPS = 30   # teto de acordadas por segundo enquanto há troca de música pendente
+
+def wait_screen(desenhar, teclas=None):
+    # teclas=None aceita qualquer tecla; devolve a tecla apertada
+    desenhar()
+    pygame.display.flip()
     while True:
-        screen.fill(BLACK)
-        # TÍTULO
-        draw_text("INSTRUÇÕES", fonte_titulo, WHITE, WIDTH//2, 80)
+        # sem nada pendente dorme até o próximo evento; com música esperando o preloader, acorda a cada quadro
+        event = pygame.event.wait(max(1, int(1000 / MENU_FPS)) if assets.pending() else 0)
+        assets.update()
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.KEYDOWN and (teclas is None or event.key in teclas):
+            return event.key
+        if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+            # a janela foi descoberta: só aí precisa desenhar de novo
+            desenhar()
+            pygame.display.flip()
+
+def draw_instructions():
+    screen.fill(BLACK)
+    # TÍTULO
+    draw_text("INSTRUÇÕES", fonte_titulo, WHITE, WIDTH//2, 80)
 
-        # TEXTO DAS INSTRUÇÕES
-        draw_text("Mover a nave:", fonte_instrucao, WHITE, WIDTH//2, 150)
-        draw_text("←  Setinha esquerda", fonte_instrucao, WHITE, WIDTH//2, 180)
-        draw_text("→  Setinha direita", fonte_instrucao, WHITE, WIDTH//2, 210)
+    # TEXTO DAS INSTRUÇÕES
+    draw_text("Mover a nave:", fonte_instrucao, WHITE, WIDTH//2, 150)
+    draw_text("←  Setinha esquerda", fonte_instrucao, WHITE, WIDTH//2, 180)
+    draw_text("→  Setinha direita", fonte_instrucao, WHITE, WIDTH//2, 210)
 
-        draw_text("Atirar:", fonte_instrucao, WHITE, WIDTH//2, 260)
-        draw_text("Barra de espaço", fonte_instrucao, WHITE, WIDTH//2, 290)
+    draw_text("Atirar:", fonte_instrucao, WHITE, WIDTH//2, 260)
+    draw_text("Barra de espaço", fonte_instrucao, WHITE, WIDTH//2, 290)
 
-        draw_text("Pressione ENTER para continuar", fonte_instrucao, YELLOW, WIDTH//2, 360)
+    draw_text("Pressione ENTER para continuar", fonte_instrucao, YELLOW, WIDTH//2, 360)
 
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    return
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+def instructions():
+    scrolling_story()
+    wait_screen(draw_instructions, teclas=(pygame.K_RETURN,))
 
-        pygame.display.flip()
+def draw_menu():
+    # ===== TÍTULO =====
+    screen.fill(BLACK)
+    draw_text("Galactic Impact", fonte_titulo, WHITE, WIDTH//2, 100)
+    draw_text("Aperte qualquer tecla para iniciar", fonte_instrucao, WHITE, 320, 200)
+    draw_ship()
 
 def menu():
-    while True:
-        # ===== TÍTULO =====
-        
-        screen.fill(BLACK)
-        draw_text("Galactic Impact", fonte_titulo, WHITE, WIDTH//2, 100)
-        draw_text("Aperte qualquer tecla para iniciar", fonte_instrucao, WHITE, 320, 200)
-        draw_ship()
-    
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                return
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        pygame.display.flip()
+    wait_screen(draw_menu)
 
 
 # =========================
@@ -387,8 +777,39 @@ def new_position(p, m):
     return (int(x_final), int(y_final))
 
 
+# =========================
+# TRANSFORMAÇÕES EM LOTE (NumPy)
+# =========================
+# Mesmas matrizes 3x3 de cima, mas como arrays: cada matriz é aplicada a todos os pontos (N, 2)
+# de um modelo numa operação só. O resultado é truncado uma única vez,
+# como o int() do new_position, e as contas seguem a mesma ordem para dar os mesmos pixels.
+CACHE_ROTACOES = 512
+
+def translation_matrix(tx, ty):
+    return np.array(translation(tx, ty), dtype=np.float64)
+
+@functools.lru_cache(maxsize=CACHE_ROTACOES)
+def rotation_matrix(angle):
+    m = np.array(rotate(angle), dtype=np.float64)
+    m.flags.writeable = False
+    return m
+
+def transform_points(pontos, m):
+    # aplica a matriz a um array (N, 2) de pontos e devolve (N, 2) inteiros truncados
+    pontos = np.asarray(pontos, dtype=np.float64)
+    xs, ys = pontos[:, 0], pontos[:, 1]
+    x_final = m[0, 0] * xs + m[0, 1] * ys + m[0, 2]
+    y_final = m[1, 0] * xs + m[1, 1] * ys + m[1, 2]
+    return np.stack((x_final, y_final), axis=1).astype(np.int64)
+
+def polygon_edges(pontos):
+    # arestas (p[i], p[i + 1]) de um polígono fechado, prontas para o draw_lines
+    return np.concatenate((pontos, np.roll(pontos, -1, axis=0)), axis=1)
 
-def scrolling_story():
+
+
+def scrolling_story(prerender=True):
+    # prerender: a história é desenhada uma vez numa superfície alta e só rolada (sem re-renderizar o texto)
     story = [
     "Há muito tempo,",
     "em uma galáxia muito,",
@@ -414,16 +835,33 @@ def scrolling_story():
 
     y = HEIGHT + 20  # começa fora da tela
     speed = 1        # velocidade da subida
+    espaco = 35      # distância entre as linhas
+
+    if prerender:
+        # a história inteira é desenhada uma vez só numa superfície alta; cada quadro só copia o trecho visível
+        margem = fonte_instrucao.get_linesize()
+        rolo = pygame.Surface((WIDTH, (len(story) - 1) * espaco + 2 * margem)).convert()
+        rolo.fill(BLACK)
+        for i, line in enumerate(story):
+            text_surface = render_text(line, fonte_instrucao, YELLOW)
+            rolo.blit(text_surface, text_surface.get_rect(center=(WIDTH//2, margem + i * espaco)))
 
     while True:
         clock.tick(60)
         screen.fill(BLACK)
 
-        for i, line in enumerate(story):
-            #configura a linha e plota na tela
-            text_surface = fonte_instrucao.render(line, True, YELLOW)
-            text_rect = text_surface.get_rect(center=(WIDTH//2, y + i * 35))
-            screen.blit(text_surface, text_rect)
+        if prerender:
+            # a linha i fica em y + i * espaco na tela, ou seja, o topo do rolo fica em y - margem
+            topo = y - margem
+            origem = max(0, -topo)
+            destino = max(0, topo)
+            screen.blit(rolo, (0, destino), pygame.Rect(0, origem, WIDTH, HEIGHT - destino))
+        else:
+            for i, line in enumerate(story):
+                #configura a linha e plota na tela
+                text_surface = render_text(line, fonte_instrucao, YELLOW)
+                text_rect = text_surface.get_rect(center=(WIDTH//2, y + i * espaco))
+                screen.blit(text_surface, text_rect)
 
         y -= speed  # translação vertical
         #captura ação do jogador - se ele apertar em alguma tecla ou quiser sair
@@ -437,7 +875,7 @@ def scrolling_story():
         pygame.display.flip()
 
         # termina quando o texto sai completamente da tela
-        if y + len(story) * 35 < 0:
+        if y + len(story) * espaco < 0:
             return
 
 # =========================
@@ -447,81 +885,51 @@ ship_pos = [VIEWPORT.centerx, VIEWPORT.bottom - 40]
 ship_angle = 0
 ship_model = [(-10,10),(0,-15),(10,10)]
 
-def desenhar_nave_detalhada(cx, cy, angle=0):
-
-    R = rotate(angle)
-
-    def T(p):
-        # Rotaciona e depois translada
-        x, y = new_position(p, R)
-        return (int(x + cx), int(y + cy))
-
-    # ===== Pontos locais da nave =====
-
-    # Corpo
-    p1 = (0, -50)
-    p2 = (20, 30)
-    p3 = (-20, 30)
-
-    # Asas
-    p4 = (-20, 0)
-    p5 = (-50, 40)
-
-    p6 = (20, 0)
-    p7 = (50, 40)
-
-    # Cockpit
-    c1 = (-8, -10)
-    c2 = (8, -10)
-    c3 = (-8, 10)
-    c4 = (8, 10)
-
-    # ===== Desenho =====
-
-    # Corpo
-    draw_line(*T(p1), *T(p2), WHITE)
-    draw_line(*T(p1), *T(p3), WHITE)
-    draw_line(*T(p3), *T(p2), WHITE)
-
-    # Asa esquerda
-    draw_line(*T(p4), *T(p5), WHITE)
-    draw_line(*T(p5), *T(p3), WHITE)
-
-    # Asa direita
-    draw_line(*T(p6), *T(p7), WHITE)
-    draw_line(*T(p7), *T(p2), WHITE)
-
-    # Cockpit
-    draw_line(*T(c1), *T(c2), WHITE)
-    draw_line(*T(c3), *T(c4), WHITE)
-    draw_line(*T(c1), *T(c3), WHITE)
-    draw_line(*T(c2), *T(c4), WHITE)
+# Pontos locais da nave detalhada (logo): corpo, asas e cockpit
+NAVE_DETALHADA = np.array([
+    (0, -50), (20, 30), (-20, 30),              # 0-2 corpo
+    (-20, 0), (-50, 40), (20, 0), (50, 40),     # 3-6 asas
+    (-8, -10), (8, -10), (-8, 10), (8, 10),     # 7-10 cockpit
+    (-10, 30), (10, 30), (0, 60),               # 11-13 fogo
+])
+# segmentos como pares de índices em NAVE_DETALHADA
+NAVE_LINHAS = np.array([
+    (0, 1), (0, 2), (2, 1),         # Corpo
+    (3, 4), (4, 2),                 # Asa esquerda
+    (5, 6), (6, 1),                 # Asa direita
+    (7, 8), (9, 10), (7, 9), (8, 10),  # Cockpit
+])
+NAVE_FOGO = np.array([(11, 13), (12, 13)])
+
+def desenhar_nave_detalhada(cx, cy, angle=0, alvo=None, fogo=None):
+    # fogo=None decide pelo relógio (pisca a cada 200 ms); o cache de sprites passa o valor fixo
+    if fogo is None:
+        fogo = (pygame.time.get_ticks() // 200) % 2 == 0
+
+    # Rotaciona todos os pontos de uma vez e depois translada (cx, cy inteiros)
+    pontos = transform_points(NAVE_DETALHADA, rotation_matrix(angle)) + (cx, cy)
+
+    # todos os segmentos brancos vão para um único draw_lines
+    draw_lines(pontos[NAVE_LINHAS].reshape(-1, 4), WHITE, alvo=alvo)
 
     # Fogo
-    if (pygame.time.get_ticks() // 200) % 2 == 0:
-        draw_line(*T((-10, 30)), *T((0, 60)), RED)
-        draw_line(*T((10, 30)), *T((0, 60)), RED)
-
+    if fogo:
+        draw_lines(pontos[NAVE_FOGO].reshape(-1, 4), RED, alvo=alvo)
 
 
-def draw_ship():
-    points = []
 
-    # cria matriz de translação
-    m_trans = translation(ship_pos[0], ship_pos[1])
+def draw_ship(pos=None, alvo=None):
+    # pos permite desenhar a nave numa posição interpolada; por padrão usa ship_pos
+    pos = pos or ship_pos
 
-    for p in ship_model:
-        novo_p = new_position(p, m_trans)
-        points.append(novo_p)
+    # cria matriz de translação e leva o modelo inteiro de uma vez
+    points = transform_points(ship_model, translation_matrix(pos[0], pos[1]))
 
     #preenchimento
-    scanline_fill(points, BLUE)
+    scanline_fill(points.tolist(), BLUE, alvo)
 
     #borda
-    for i in range(len(points)):
-        p1 = points[i]
-        p2 = points[(i + 1) % len(points)]
-        draw_line(p1[0], p1[1], p2[0], p2[1], WHITE)
+    draw_lines(polygon_edges(points), WHITE, alvo)
 
 
 
@@ -537,17 +945,16 @@ def get_outcode(x, y, rect):
     elif y > rect.bottom: code |= BOTTOM
     return code
 
-# delimita a parte que será cortada desenhando as linhas cortadas
-def draw_line_clipped(x0, y0, x1, y1, rect, color):
+# recorta o segmento contra o retângulo (Cohen-Sutherland); devolve o trecho visível ou None
+def clip_line(x0, y0, x1, y1, rect):
     outcode0 = get_outcode(x0, y0, rect)
     outcode1 = get_outcode(x1, y1, rect)
     
     while True:
         if not (outcode0 | outcode1): # Ambos dentro
-            draw_line(int(x0), int(y0), int(x1), int(y1), color)
-            break
+            return (int(x0), int(y0), int(x1), int(y1))
         elif outcode0 & outcode1: # Ambos fora (mesma região)
-            break
+            return None
         else:
             # Precisa de recorte
             outcode_out = outcode0 if outcode0 else outcode1
@@ -570,120 +977,522 @@ def draw_line_clipped(x0, y0, x1, y1, rect, color):
             else:
                 x1, y1, outcode1 = x, y, get_outcode(x, y, rect)
 
-# desenha a área do zoom
-def draw_zoom_system():
+# delimita a parte que será cortada desenhando as linhas cortadas
+def draw_line_clipped(x0, y0, x1, y1, rect, color, alvo=None):
+    seg = clip_line(x0, y0, x1, y1, rect)
+    if seg is not None:
+        draw_line(*seg, color, alvo)
 
-    # --- 1. LIMPEZA E OCLUSÃO ---
-    # Preenchemos o retângulo da viewport com PRETO para que nada 
+# =========================
+# CAMADA ESTÁTICA (FUNDO)
+# =========================
+# A borda da VIEWPORT e a moldura do zoom nunca mudam durante o jogo: são rasterizadas uma vez
+# numa superfície fora da tela e só copiadas a cada quadro. Se o layout mudar, a camada é refeita.
+# São duas camadas porque a moldura do zoom entra por cima das entidades (oclusão), não no fundo.
+
+def draw_viewport_border(alvo=None):
+    xs = np.arange(VIEWPORT.left, VIEWPORT.right)
+    ys = np.arange(VIEWPORT.top, VIEWPORT.bottom)
+    (alvo or canvas).set_pixels(np.concatenate([xs, xs, np.full(len(ys), VIEWPORT.left), np.full(len(ys), VIEWPORT.right)]),
+                                np.concatenate([np.full(len(xs), VIEWPORT.top), np.full(len(xs), VIEWPORT.bottom), ys, ys]),
+                                WHITE)
+
+def zoom_frame_rect():
+    # as bordas right/bottom do zoom são inclusivas, por isso o +1 no tamanho
+    return pygame.Rect(ZOOM_VIEWPORT.left, ZOOM_VIEWPORT.top, ZOOM_VIEWPORT.width + 1, ZOOM_VIEWPORT.height + 1)
+
+def draw_zoom_frame(alvo=None):
+    alvo = alvo or canvas
+    # Preenchemos o retângulo da viewport com PRETO para que nada
     # que venha "de baixo" (do jogo principal) apareça aqui dentro.
-    for x in range(ZOOM_VIEWPORT.left, ZOOM_VIEWPORT.right + 1):
-        for y in range(ZOOM_VIEWPORT.top, ZOOM_VIEWPORT.bottom + 1):
-            set_pixel(x, y, BLACK)
-
-    # --- 2. DESENHO DA MOLDURA ---
-    for x in range(ZOOM_VIEWPORT.left, ZOOM_VIEWPORT.right + 1):
-        set_pixel(x, ZOOM_VIEWPORT.top, GRAY)
-        set_pixel(x, ZOOM_VIEWPORT.bottom, GRAY)
-    for y in range(ZOOM_VIEWPORT.top, ZOOM_VIEWPORT.bottom + 1):
-        set_pixel(ZOOM_VIEWPORT.left, y, GRAY)
-        set_pixel(ZOOM_VIEWPORT.right, y, GRAY)
-
-    # --- 3. MAPEAMENTO JANELA-VIEWPORT ---
-    # Define a janela do mundo que será ampliada
-    window_size = 60 
-    win_left = ship_pos[0] - window_size
-    win_right = ship_pos[0] + window_size
-    win_top = ship_pos[1] - window_size
-    win_bottom = ship_pos[1] + window_size
-
-    def map_coords(world_x, world_y):
-        zx = (world_x - win_left) / (win_right - win_left) * ZOOM_VIEWPORT.width + ZOOM_VIEWPORT.left
-        zy = (world_y - win_top) / (win_bottom - win_top) * ZOOM_VIEWPORT.height + ZOOM_VIEWPORT.top
-        return int(zx), int(zy)
-
-    # --- 4. TIROS NO ZOOM (COM CLIPPING) ---
-    for s in shots:
-        zx0, zy0 = map_coords(s["x"], s["y"])
-        zx1, zy1 = map_coords(s["x"], s["y"] - 8)
-        # Usamos o draw_line_clipped para o tiro não vazar da borda cinza
-        draw_line_clipped(zx0, zy0, zx1, zy1, ZOOM_VIEWPORT, YELLOW)
-
-    # --- 5. NAVE NO ZOOM (COM CLIPPING) ---
-    zx_center, zy_center = map_coords(ship_pos[0], ship_pos[1])
-    zoom_points = []
-    for p in ship_model:
-        #rp = rotate(p, ship_angle)
-        px, py = map_coords(ship_pos[0] + p[0], ship_pos[1] + p[1])
-        zoom_points.append((px, py))
-    
-    for i in range(len(zoom_points)):
-        p1 = zoom_points[i]
-        p2 = zoom_points[(i + 1) % len(zoom_points)]
-        # A nave só aparece dentro do limite da ZOOM_VIEWPORT
-        draw_line_clipped(p1[0], p1[1], p2[0], p2[1], ZOOM_VIEWPORT, BLUE)
-    
-    # Preenchimento Boundary Fill (inicia no centro da nave)
-    if ZOOM_VIEWPORT.collidepoint(zx_center, zy_center):
-        boundary_fill(zx_center, zy_center, BLUE, BLUE)
+    alvo.fill_rect(zoom_frame_rect(), BLACK)
+    # moldura
+    xs = np.arange(ZOOM_VIEWPORT.left, ZOOM_VIEWPORT.right + 1)
+    ys = np.arange(ZOOM_VIEWPORT.top, ZOOM_VIEWPORT.bottom + 1)
+    alvo.set_pixels(np.concatenate([xs, xs, np.full(len(ys), ZOOM_VIEWPORT.left), np.full(len(ys), ZOOM_VIEWPORT.right)]),
+                    np.concatenate([np.full(len(xs), ZOOM_VIEWPORT.top), np.full(len(xs), ZOOM_VIEWPORT.bottom), ys, ys]),
+                    GRAY)
+
+def draw_static_background(alvo):
+    alvo.fill_rect((0, 0, alvo.width, alvo.height), BLACK)
+    draw_viewport_border(alvo)
+
+
+class StaticLayer:
+    def __init__(self, desenhar):
+        self.desenhar = desenhar
+        self.surface = None
+        self.array = None   # cópia dos pixels (mapeados), para copiar direto para um canvas travado
+        self._chave = None
+
+    def layout_key(self, formato):
+        # tudo o que muda o desenho da camada: tamanho da tela, retângulos e formato de pixel do destino
+        return (WIDTH, HEIGHT, tuple(VIEWPORT), tuple(ZOOM_VIEWPORT),
+                formato.get_bitsize(), formato.get_masks())
+
+    def get(self, formato=None):
+        # devolve a superfície da camada, refazendo só se o layout mudou
+        formato = formato or canvas.surface
+        chave = self.layout_key(formato)
+        if chave != self._chave:
+            self.surface = pygame.Surface((WIDTH, HEIGHT), 0, formato)
+            self.desenhar(Canvas(self.surface))
+            self.array = pygame.surfarray.array2d(self.surface)
+            self._chave = chave
+        return self.surface
+
+
+background = StaticLayer(draw_static_background)
+zoom_layer = StaticLayer(draw_zoom_frame)
+
+# ZOOM RENDERIZADO NUMA TEXTURA
+# A janela do mundo em volta da nave é desenhada numa superfície pequena, do tamanho da ZOOM_VIEWPORT,
+# e depois copiada para a tela de uma vez. O mapeamento janela-viewport é feito em lote (arrays),
+# e só os tiros que chegam a encostar no zoom passam pelo recorte de Cohen-Sutherland.
+ZOOM_WINDOW_SIZE = 60        # meia largura/altura da janela do mundo quando não há ampliação definida
+ZOOM_MAGNIFICATION = None    # ex.: 2.5 - a janela passa a ter o tamanho do zoom dividido pela ampliação
+ZOOM_ALL_ENTITIES = False    # também desenha os asteroides dentro do zoom
+
+_zoom_alvo = None
+
+def zoom_target():
+    # canvas fora da tela com o tamanho da moldura do zoom (refeito se o tamanho ou o formato mudar)
+    global _zoom_alvo
+    rect = zoom_frame_rect()
+    formato = canvas.surface
+    if (_zoom_alvo is None or _zoom_alvo.surface.get_size() != rect.size
+            or _zoom_alvo.surface.get_masks() != formato.get_masks()):
+        _zoom_alvo = Canvas(pygame.Surface(rect.size, 0, formato))
+    return _zoom_alvo
+
+def zoom_window():
+    # janela do mundo (esquerda, topo, direita, baixo) centrada na nave
+    if ZOOM_MAGNIFICATION:
+        meia_w = ZOOM_VIEWPORT.width / (2 * ZOOM_MAGNIFICATION)
+        meia_h = ZOOM_VIEWPORT.height / (2 * ZOOM_MAGNIFICATION)
+    else:
+        meia_w = meia_h = ZOOM_WINDOW_SIZE
+    return (ship_pos[0] - meia_w, ship_pos[1] - meia_h, ship_pos[0] + meia_w, ship_pos[1] + meia_h)
+
+def window_to_viewport(xs, ys, janela, rect):
+    # mapeamento janela-viewport em lote; a conversão para inteiro trunca como o int() da versão ponto a ponto
+    win_left, win_top, win_right, win_bottom = janela
+    zx = (np.asarray(xs) - win_left) / (win_right - win_left) * rect.width + rect.left
+    zy = (np.asarray(ys) - win_top) / (win_bottom - win_top) * rect.height + rect.top
+    return zx.astype(np.int64), zy.astype(np.int64)
+
+def outcodes(xs, ys, rect):
+    # versão vetorizada do get_outcode
+    return (np.where(xs < rect.left, LEFT, np.where(xs > rect.right, RIGHT, INSIDE))
+            | np.where(ys < rect.top, TOP, np.where(ys > rect.bottom, BOTTOM, INSIDE)))
+
+def clip_segments(x0, y0, x1, y1, rect):
+    # descarta em lote os segmentos totalmente de um lado do retângulo e recorta só os que sobram
+    vivos = np.flatnonzero((outcodes(x0, y0, rect) & outcodes(x1, y1, rect)) == 0)
+    segs = []
+    for i in vivos.tolist():
+        seg = clip_line(int(x0[i]), int(y0[i]), int(x1[i]), int(y1[i]), rect)
+        if seg is not None:
+            segs.append(seg)
+    return segs
+
+def _local(segs, ox, oy):
+    # coordenadas da tela -> coordenadas da textura do zoom
+    return [(x0 - ox, y0 - oy, x1 - ox, y1 - oy) for x0, y0, x1, y1 in segs]
+
+# desenha a área do zoom
+def draw_zoom_system(destino=None):
+    # monta a textura do zoom e cola por cima do jogo
+    rect = zoom_frame_rect()
+    (destino or canvas).copy_from_at(render_zoom_texture(), rect.left, rect.top)
+
+def render_zoom_texture():
+    # devolve uma cópia dos pixels da textura do zoom (tamanho de zoom_frame_rect)
+    rect = zoom_frame_rect()
+    ox, oy = rect.left, rect.top
+    alvo = zoom_target()
+    zoom_layer.get()
+    moldura = zoom_layer.array[rect.left:rect.right, rect.top:rect.bottom]
+
+    with alvo:
+        # --- 1 e 2. LIMPEZA, OCLUSÃO E MOLDURA ---
+        # A textura começa com o fundo preto + moldura cinza da camada estática.
+        alvo.pixels[:] = moldura
+
+        # --- 3. MAPEAMENTO JANELA-VIEWPORT ---
+        # Define a janela do mundo que será ampliada
+        janela = zoom_window()
+
+        # --- 4. ASTEROIDES NO ZOOM (OPCIONAL) ---
+        if ZOOM_ALL_ENTITIES and len(asteroids):
+            escala_x = ZOOM_VIEWPORT.width / (janela[2] - janela[0])
+            escala_y = ZOOM_VIEWPORT.height / (janela[3] - janela[1])
+            zx, zy = window_to_viewport(asteroids.xs, asteroids.ys, janela, ZOOM_VIEWPORT)
+            rx = np.rint(asteroids.rs * escala_x).astype(np.int64)
+            ry = np.rint(asteroids.rs * escala_y).astype(np.int64)
+            # só os que encostam no zoom (círculo vira elipse se a escala não for uniforme)
+            visiveis = (outcodes(zx - rx, zy - ry, ZOOM_VIEWPORT) & outcodes(zx + rx, zy + ry, ZOOM_VIEWPORT)) == 0
+            for x, y, a, b in zip((zx[visiveis] - ox).tolist(), (zy[visiveis] - oy).tolist(),
+                                  rx[visiveis].tolist(), ry[visiveis].tolist()):
+                fill_ellipse(x, y, a, b, GRAY, WHITE, alvo)
+            # a moldura fica por cima dos asteroides que encostam na borda
+            alvo.pixels[0, :], alvo.pixels[-1, :] = moldura[0, :], moldura[-1, :]
+            alvo.pixels[:, 0], alvo.pixels[:, -1] = moldura[:, 0], moldura[:, -1]
+
+        # --- 5. TIROS NO ZOOM (COM CLIPPING) ---
+        # Todos os tiros são mapeados de uma vez; recortamos cada um que sobra para ele não vazar da borda cinza
+        zx0, zy0 = window_to_viewport(shots.xs, shots.ys, janela, ZOOM_VIEWPORT)
+        zx1, zy1 = window_to_viewport(shots.xs, shots.ys - 8, janela, ZOOM_VIEWPORT)
+        draw_lines(_local(clip_segments(zx0, zy0, zx1, zy1, ZOOM_VIEWPORT), ox, oy), YELLOW, alvo)
+
+        # --- 6. NAVE NO ZOOM (COM CLIPPING) ---
+        # o modelo vai para o mundo junto com o centro (último ponto) numa transformação só
+        mundo = transform_points(ship_model + [(0, 0)], translation_matrix(ship_pos[0], ship_pos[1]))
+        zx, zy = window_to_viewport(mundo[:, 0], mundo[:, 1], janela, ZOOM_VIEWPORT)
+        px, py, zx_center, zy_center = zx[:-1], zy[:-1], int(zx[-1]), int(zy[-1])
+        # arestas (p[i], p[i + 1]) do polígono; a nave só aparece dentro do limite da ZOOM_VIEWPORT
+        qx, qy = np.roll(px, -1), np.roll(py, -1)
+        draw_lines(_local(clip_segments(px, py, qx, qy, ZOOM_VIEWPORT), ox, oy), BLUE, alvo)
+
+        # Preenchimento Boundary Fill (inicia no centro da nave); fica preso ao tamanho da textura
+        if ZOOM_VIEWPORT.collidepoint(zx_center, zy_center):
+            boundary_fill(zx_center - ox, zy_center - oy, BLUE, BLUE, alvo)
+
+        # --- 7. COMPOSIÇÃO ---
+        # a textura pronta entra na tela por cima do jogo, numa cópia só (feita por quem chamou)
+        return alvo.pixels.copy()
+
+
+# =========================
+# ENTIDADES (ESTRUTURA DE ARRAYS)
+# =========================
+class EntityStore:
+    # Tiros e asteroides ficam em arrays NumPy pré-alocados (um array por campo) em vez de listas de dicts.
+    # As entidades vivas ocupam sempre o começo dos arrays [0:count]; remover é trocar com a última (swap-remove).
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.r = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # visões (sem cópia) só das entidades em uso
+    @property
+    def xs(self):
+        return self.x[:self.count]
+
+    @property
+    def ys(self):
+        return self.y[:self.count]
+
+    @property
+    def rs(self):
+        return self.r[:self.count]
+
+    def add(self, x, y, r=0):
+        # quando enche, a capacidade dobra (raro, então quase nunca há alocação)
+        if self.count == len(self.x):
+            nova = 2 * len(self.x)
+            self.x = np.resize(self.x, nova)
+            self.y = np.resize(self.y, nova)
+            self.r = np.resize(self.r, nova)
+            self.alive = np.resize(self.alive, nova)
+        i = self.count
+        self.x[i], self.y[i], self.r[i] = x, y, r
+        self.alive[i] = True
+        self.count += 1
+        return i
+
+    def remove(self, i):
+        # swap-remove: a última entidade ocupa o lugar da removida
+        ultimo = self.count - 1
+        if i != ultimo:
+            self.x[i], self.y[i], self.r[i] = self.x[ultimo], self.y[ultimo], self.r[ultimo]
+            self.alive[i] = self.alive[ultimo]
+        self.alive[ultimo] = False
+        self.count = ultimo
+
+    def kill(self, mask_or_indices):
+        # só marca como morta; a remoção de fato acontece no sweep(), uma vez por tick
+        self.alive[:self.count][mask_or_indices] = False
+
+    def sweep(self):
+        # remove todas as mortas; do maior índice para o menor, assim a última trocada nunca é uma pendente
+        for i in np.flatnonzero(~self.alive[:self.count])[::-1].tolist():
+            self.remove(i)
+
+    def move(self, dx, dy):
+        # movimento vetorizado de todas as entidades
+        self.x[:self.count] += dx
+        self.y[:self.count] += dy
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+
 # =========================
 # TIROS
 # =========================
-shots = []
+shots = EntityStore()
 
 def shoot():
     # -15 é para o tiro nascer um pouco à frente da nave, e não exatamente no centro.
-    shots.append({"x":ship_pos[0], "y":ship_pos[1]-15})
+    shots.add(ship_pos[0], ship_pos[1]-15)
 
-def draw_shots():
-    for s in shots:
-        # -8 é para fazer o tiro ser para cima
-        draw_line(s["x"], s["y"], s["x"], s["y"]-8, YELLOW)
+def draw_shots(dy=0, alvo=None):
+    # -8 é para fazer o tiro ser para cima; todos os tiros saem num único draw_lines
+    # (dy desloca o desenho, usado pela interpolação da renderização)
+    xs, ys = shots.xs, shots.ys + dy
+    draw_lines(np.stack([xs, ys, xs, ys - 8], axis=1), YELLOW, alvo)
 
 # =========================
 # ASTEROIDES
 # =========================
-asteroids = []
+asteroids = EntityStore()
 
-#define os dados do asteroide(como ele tem que ser)
+#define os dados do asteroide(como ele tem que ser) e coloca no conjunto de asteroides
 def spawn_asteroid():
-    return {
+    return asteroids.add(
         # faz com que o asteroide nasça em locais aleatorios, +20 e -20 faz com que ele não nasça cortado
-        "x": random.randint(VIEWPORT.left+20, VIEWPORT.right-20),
-        "y": VIEWPORT.top,
-        "r": 15
-    }
+        random.randint(VIEWPORT.left+20, VIEWPORT.right-20),
+        VIEWPORT.top,
+        15
+    )
+
+def draw_asteroid(x, y, r, alvo=None):
+    draw_circle(x, y, r, WHITE, alvo)
+    flood_fill(x, y, BLACK, GRAY, alvo)
+
+def asteroid_uses_sprite(x, y, r):
+    # encostando na borda da viewport o flood_fill para na linha da borda; aí vai o procedural
+    return SPRITES and VIEWPORT.left < x - r and x + r < VIEWPORT.right and VIEWPORT.top < y - r and y + r < VIEWPORT.bottom
+
+def draw_asteroids(dy=0):
+    for x, y, r in zip(asteroids.xs.tolist(), (asteroids.ys + dy).tolist(), asteroids.rs.tolist()):
+        # asteroide inteiro fora do recorte ativo não passa nem pelo rasterizador
+        if canvas.box_outside(x - r, y - r, x + r, y + r):
+            continue
+        if asteroid_uses_sprite(x, y, r):
+            draw_asteroid_sprite(x, y, r)
+        else:
+            draw_asteroid(x, y, r)
+
+# =========================
+# CACHE DE SPRITES
+# =========================
+# A nave detalhada e os asteroides são rasterizados uma vez numa superfície pequena e depois
+# só colados. A chave leva a forma, o ângulo quantizado, o raio e as cores; no ângulo exato da
+# chave o resultado é idêntico ao desenho procedural. O cache descarta os menos usados quando
+# passa de SPRITE_CACHE_BYTES.
+SPRITES = True
+SPRITE_ANGLE_STEP = 2.0  # graus
+SPRITE_CACHE_BYTES = 32 * 1024 * 1024
+
+Sprite = collections.namedtuple("Sprite", "pixels opaco fundo chave ox oy")
+
+
+class SpriteCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.sprites = collections.OrderedDict()
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        # as faixas da renderização paralela pedem sprites ao mesmo tempo
+        self._trava = threading.Lock()
+
+    def get(self, chave, desenhar, raio, destino, preenchimento=()):
+        # desenhar(alvo, c) rasteriza a forma centrada em (c, c) numa superfície de lado 2*raio+1;
+        # pixels com as cores de `preenchimento` só são colados sobre o fundo (como o flood_fill)
+        chave = chave + (destino.surface.get_bitsize(), destino.surface.get_masks())
+        with self._trava:
+            return self._get(chave, desenhar, raio, destino, preenchimento)
+
+    def _get(self, chave, desenhar, raio, destino, preenchimento):
+        sprite = self.sprites.get(chave)
+        if sprite is not None:
+            self.sprites.move_to_end(chave)
+            self.acertos += 1
+            return sprite
+        self.faltas += 1
+        sprite = self._rasterizar(desenhar, raio, destino, preenchimento)
+        self.sprites[chave] = sprite
+        self.bytes += sprite.pixels.nbytes + sprite.opaco.nbytes + sprite.fundo.nbytes
+        while self.bytes > self.max_bytes and len(self.sprites) > 1:
+            _, velho = self.sprites.popitem(last=False)
+            self.bytes -= velho.pixels.nbytes + velho.opaco.nbytes + velho.fundo.nbytes
+        return sprite
+
+    def _rasterizar(self, desenhar, raio, destino, preenchimento):
+        lado = 2 * raio + 1
+        alvo = Canvas(pygame.Surface((lado, lado), 0, destino.surface))
+        chave = alvo.map_color(BLACK)
+        alvo.fill_rect((0, 0, lado, lado), BLACK)
+        with alvo:
+            desenhar(alvo, raio)
+            pixels = alvo.pixels.copy()
+        fundo = np.isin(pixels, [alvo.map_color(cor) for cor in preenchimento])
+        opaco = (pixels != chave) & ~fundo
+        # recorta para a caixa dos pixels desenhados
+        usados = opaco | fundo
+        xs, ys = np.nonzero(usados.any(axis=1))[0], np.nonzero(usados.any(axis=0))[0]
+        if len(xs) == 0:
+            vazio = np.zeros((0, 0), dtype=bool)
+            return Sprite(pixels[:0, :0].copy(), vazio, vazio, chave, 0, 0)
+        fatia = (slice(xs[0], xs[-1] + 1), slice(ys[0], ys[-1] + 1))
+        return Sprite(pixels[fatia].copy(), opaco[fatia].copy(), fundo[fatia].copy(),
+                      chave, int(xs[0]) - raio, int(ys[0]) - raio)
+
+    def clear(self):
+        self.sprites.clear()
+        self.bytes = 0
+
+
+sprite_cache = SpriteCache(SPRITE_CACHE_BYTES)
+
+
+def quantize_angle(angle):
+    passo = SPRITE_ANGLE_STEP
+    return (round(angle / passo) * passo) % 360
+
+
+def draw_detailed_ship(cx, cy, angle=0, alvo=None):
+    # versão em cache de desenhar_nave_detalhada (a nave cabe num raio de 70 px, contando o fogo)
+    alvo = alvo or canvas
+    # passo 0: cada ângulo seria um sprite novo (a intro gira um pouco a cada quadro), então desenha direto
+    if not SPRITES or not SPRITE_ANGLE_STEP:
+        desenhar_nave_detalhada(cx, cy, angle, alvo=alvo)
+        return
+    q = quantize_angle(angle)
+    fogo = (pygame.time.get_ticks() // 200) % 2 == 0
+    sprite = sprite_cache.get(("nave", q, fogo), lambda a, c: desenhar_nave_detalhada(c, c, q, alvo=a, fogo=fogo),
+                              70, alvo)
+    alvo.stamp(sprite, cx + sprite.ox, cy + sprite.oy)
+
 
-def draw_asteroid(a):
-    draw_circle(a["x"], a["y"], a["r"], WHITE)
-    flood_fill(a["x"], a["y"], BLACK, GRAY)
+def draw_asteroid_sprite(x, y, r, alvo=None):
+    # mesmo resultado de draw_asteroid: contorno sempre por cima e cinza só onde o fundo é preto
+    alvo = alvo or canvas
+
+    def desenhar(a, c):
+        draw_circle(c, c, r, WHITE, alvo=a)
+        flood_fill(c, c, BLACK, GRAY, alvo=a)
+
+    sprite = sprite_cache.get(("asteroide", r, WHITE, GRAY), desenhar, r + 1, alvo, preenchimento=(GRAY,))
+    alvo.stamp(sprite, x + sprite.ox, y + sprite.oy)
 
 # =========================
 # COLISÕES
 # =========================
+# As funções de teste aceitam tanto números quanto arrays: com arrays devolvem uma máscara de colisão.
 
 # tiro e asteroide
-def hit_asteroid(s, a):
-    #verificação de colisão por meio de distância euclidiana entre seus centros entre tiro e asteroide
-    return math.hypot(s["x"]-a["x"], s["y"]-a["y"]) < a["r"]
+def hit_asteroid(sx, sy, ax, ay, r):
+    #verificação de colisão por meio da distância euclidiana entre seus centros entre tiro e asteroide
+    #(comparando os quadrados, sem precisar da raiz do hypot)
+    dx, dy = sx - ax, sy - ay
+    return dx*dx + dy*dy < r*r
 #nave e asteroide
-def hit_ship(a):
-    #verificação de colisão por meio de distância euclidiana entre seus centros, entre asteroide e nave
-    return math.hypot(a["x"]-ship_pos[0], a["y"]-ship_pos[1]) < a["r"] + 12
+def hit_ship(ax, ay, r):
+    #verificação de colisão por meio da distância euclidiana (ao quadrado) entre seus centros, entre asteroide e nave
+    dx, dy = ax - ship_pos[0], ay - ship_pos[1]
+    alcance = r + 12
+    return dx*dx + dy*dy < alcance*alcance
+
+
+# GRADE UNIFORME (BROADPHASE)
+# A VIEWPORT é dividida em células; cada asteroide é registrado nas células que sua caixa envolvente toca.
+# Um tiro só é testado (hit_asteroid, fase fina) contra os asteroides da célula onde ele está.
+GRID_CELL = 32
+
+class SpatialGrid:
+    def __init__(self, rect, cell=GRID_CELL):
+        self.rect = rect
+        self.cell = cell
+        self.cols = rect.width // cell + 1
+        self.rows = rect.height // cell + 1
+        # pares (célula, índice) ordenados por célula, refeitos a cada tick
+        self.cell_ids = np.empty(0, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int64)
+
+    def cell_of(self, xs, ys):
+        # posições fora da viewport caem na célula da borda mais próxima, então nada se perde
+        cx = np.clip((np.asarray(xs) - self.rect.left) // self.cell, 0, self.cols - 1)
+        cy = np.clip((np.asarray(ys) - self.rect.top) // self.cell, 0, self.rows - 1)
+        return cx, cy
+
+    def rebuild(self, xs, ys, rs):
+        # refeita a cada tick (os asteroides se movem todo quadro), sem laço por entidade:
+        # para cada deslocamento (oc, ol) dentro da caixa envolvente gera os pares de uma vez
+        c0, l0 = self.cell_of(xs - rs, ys - rs)
+        c1, l1 = self.cell_of(xs + rs, ys + rs)
+        ids, idx = [], []
+        if len(xs):
+            for oc in range(int((c1 - c0).max()) + 1):
+                for ol in range(int((l1 - l0).max()) + 1):
+                    m = (c0 + oc <= c1) & (l0 + ol <= l1)
+                    ids.append(((c0 + oc) * self.rows + l0 + ol)[m])
+                    idx.append(np.flatnonzero(m))
+        if not ids:
+            self.cell_ids = self.indices = np.empty(0, dtype=np.int64)
+            return
+        ids = np.concatenate(ids)
+        idx = np.concatenate(idx)
+        # dentro de cada célula os índices ficam em ordem crescente
+        ordem = np.lexsort((idx, ids))
+        self.cell_ids, self.indices = ids[ordem], idx[ordem]
+
+    def candidates(self, xs, ys):
+        # pares candidatos (índice do ponto, índice da entidade) - pontos em ordem e, para cada um, entidades em ordem
+        cx, cy = self.cell_of(xs, ys)
+        cid = cx * self.rows + cy
+        lo = np.searchsorted(self.cell_ids, cid, "left")
+        qtd = np.searchsorted(self.cell_ids, cid, "right") - lo
+        pontos = np.repeat(np.arange(len(cid)), qtd)
+        desloc = np.arange(qtd.sum()) - np.repeat(np.cumsum(qtd) - qtd, qtd)
+        return pontos, self.indices[np.repeat(lo, qtd) + desloc]
+
+
+collision_grid = SpatialGrid(VIEWPORT)
+
+def collide_shots(shots, asteroids, grid=collision_grid):
+    # Cada tiro acerta o primeiro asteroide ainda vivo (na ordem do conjunto) que o contém, como no laço antigo.
+    # Os acertos são só marcados (kill); a remoção acontece no sweep. Devolve a quantidade de acertos.
+    grid.rebuild(asteroids.xs, asteroids.ys, asteroids.rs)
+    si, ai = grid.candidates(shots.xs, shots.ys)
+    # fase fina vetorizada: máscara de colisão de todos os pares candidatos
+    acerto = hit_asteroid(shots.xs[si], shots.ys[si], asteroids.xs[ai], asteroids.ys[ai], asteroids.rs[ai])
+    acertos = 0
+    for s, a in zip(si[acerto].tolist(), ai[acerto].tolist()):
+        if shots.alive[s] and asteroids.alive[a]:
+            shots.alive[s] = False
+            asteroids.alive[a] = False
+            acertos += 1
+    return acertos
 # ===========================
 # PONTUAÇÃO
 # ===========================
 score = 0
 
-def draw_score(current_score, x, y, size, color):
+def draw_score(current_score, x, y, size, color, alvo=None):
     #converte o numero para string
     score_str = str(current_score)
     #controle de deslocamento horizontal
     offset = 0
+    # junta os segmentos de todos os dígitos e desenha tudo de uma vez
+    segs = []
     for char in score_str:
-        draw_digit(int(char), x + offset, y, size, color)
+        segs.extend(digit_segments(int(char), x + offset, y, size))
         offset += size + 10 # Espaço entre números
+    draw_lines(segs, color, alvo)
 
 def draw_digit(digit, x, y, size, color):
+    draw_lines(digit_segments(digit, x, y, size), color)
+
+def digit_segments(digit, x, y, size):
     # Segmentos: 0=topo, 1=meio, 2=base, 3=esq_cima, 4=dir_cima, 5=esq_baixo, 6=dir_baixo
     # Definimos as coordenadas relativas de cada segmento
     seg = {
@@ -710,103 +1519,1010 @@ def draw_digit(digit, x, y, size, color):
         9: [0, 1, 2, 3, 4, 6]
     }
 
+    segs = []
     if digit in digits:
         for s_index in digits[digit]:
             x0_rel, y0_rel, x1_rel, y1_rel = seg[s_index]
-            # Multiplica pelo tamanho e desenha com Bresenham (draw_line)
-            draw_line(x + x0_rel * size, y + y0_rel * size, 
-                      x + x1_rel * size, y + y1_rel * size, color)
+            # Multiplica pelo tamanho (o desenho com Bresenham fica para o draw_lines)
+            segs.append((x + x0_rel * size, y + y0_rel * size,
+                         x + x1_rel * size, y + y1_rel * size))
+    return segs
 
 # =========================
 # FIM DE JOGO
 # =========================
-def game_over():
+def draw_game_over():
     screen.fill(BLACK)
-    pygame.mixer.music.stop()
     draw_text("FIM DE JOGO", fonte_titulo, RED, WIDTH//2, HEIGHT//2)
 
-    pygame.display.flip()
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN or event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+def game_over():
+    pygame.mixer.music.stop()
+    wait_screen(draw_game_over)
+    pygame.quit()
+    sys.exit()
 
 
 
 
-intro_logo()
-instructions()
-menu()
+# =========================
+# PROFILER POR ETAPA DO QUADRO
+# =========================
+class FrameProfiler:
+    # Mede quanto cada etapa do quadro leva (em ms) e quantos pixels foram escritos/lidos no canvas.
+    # Os últimos `capacity` quadros ficam num buffer circular; F3 liga/desliga o painel com p50/p95/p99.
+    # Etapas aninhadas são descontadas da etapa de fora (cada etapa mostra só o tempo dela).
+    def __init__(self, capacity=600):
+        self.enabled = False
+        self.overlay = False
+        self.history = collections.deque(maxlen=capacity)
+        self.frames = 0
+        self._atual = None
+        self._pilha = []
+        self._fonte = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._atual = {}
+        self._inicio = time.perf_counter()
+        self._escritos, self._lidos = canvas.escritos, canvas.lidos
+
+    @contextlib.contextmanager
+    def stage(self, nome):
+        if self._atual is None:
+            yield
+            return
+        inicio = time.perf_counter()
+        self._pilha.append(0.0)   # tempo gasto pelas etapas de dentro desta
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            filhos = self._pilha.pop()
+            self._atual[nome] = self._atual.get(nome, 0.0) + (duracao - filhos) * 1000
+            if self._pilha:
+                self._pilha[-1] += duracao
+
+    def end_frame(self):
+        if self._atual is None:
+            return
+        registro = self._atual
+        registro["frame"] = (time.perf_counter() - self._inicio) * 1000
+        registro["pixels_escritos"] = canvas.escritos - self._escritos
+        registro["pixels_lidos"] = canvas.lidos - self._lidos
+        self.history.append(registro)
+        self.frames += 1
+        self._atual = None
+
+    def columns(self):
+        # nomes das etapas na ordem em que apareceram
+        nomes = {}
+        for registro in self.history:
+            nomes.update(dict.fromkeys(registro))
+        return list(nomes)
+
+    def percentiles(self):
+        # {etapa: (p50, p95, p99)} sobre o histórico (etapa ausente num quadro conta como 0)
+        resultado = {}
+        for nome in self.columns():
+            valores = np.array([registro.get(nome, 0.0) for registro in self.history])
+            resultado[nome] = tuple(np.percentile(valores, (50, 95, 99)))
+        return resultado
+
+    def draw_overlay(self, surface):
+        if not self.history:
+            return None
+        if self._fonte is None:
+            self._fonte = pygame.font.SysFont("consolas", 13)
+        linhas = [f"{'etapa':16s}{'p50':>9s}{'p95':>9s}{'p99':>9s}"]
+        for nome, (p50, p95, p99) in self.percentiles().items():
+            # tempos em ms com 2 casas; contadores de pixels como inteiros
+            formato = "9.0f" if nome.startswith("pixels") else "9.2f"
+            linhas.append(f"{nome:16s}{p50:{formato}}{p95:{formato}}{p99:{formato}}")
+        altura = self._fonte.get_linesize()
+        fundo = pygame.Surface((300, altura * len(linhas) + 8))
+        fundo.set_alpha(200)
+        area = surface.blit(fundo, (WIDTH - 305, 45))
+        for i, linha in enumerate(linhas):
+            surface.blit(self._fonte.render(linha, True, WHITE), (WIDTH - 300, 49 + i * altura))
+        # devolve a área ocupada pelo painel (usada pela renderização por retângulos sujos)
+        return area
+
+    def dump_csv(self, path):
+        colunas = self.columns()
+        primeiro = self.frames - len(self.history)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["quadro"] + colunas)
+            for i, registro in enumerate(self.history):
+                escritor.writerow([primeiro + i] + [registro.get(nome, 0) for nome in colunas])
+
+
+profiler = FrameProfiler()
 
 # =========================
-# LOOP PRINCIPAL
+# SIMULAÇÃO (PASSO FIXO)
 # =========================
+# A lógica anda sempre em passos de SIM_DT segundos, não importa quantos quadros são desenhados.
+# As velocidades são por passo, com os mesmos valores de quando o jogo andava um passo por quadro.
+SIM_HZ = 60
+SIM_DT = 1 / SIM_HZ
+MAX_CATCHUP = 5          # máximo de passos por quadro para alcançar o tempo real (evita espiral de lentidão)
+INTERPOLATE = True       # desenha as entidades entre o passo anterior e o atual
+LATE_INPUT = False       # lê o teclado logo antes de cada passo e desenha a nave sem o recuo da interpolação
+SHIP_SPEED = 4
+ASTEROID_SPEED = 3
+SHOT_SPEED = 8
+SPAWN_INTERVAL = 40      # passos entre asteroides
+
 spawn_timer = 0
+ship_prev_x = ship_pos[0]
 
-while True:
-    clock.tick(FPS)
+def update(left=False, right=False, fire=0):
+    # avança a simulação um passo: fire é quantas vezes o espaço foi apertado desde o último passo.
+    # Devolve False quando um asteroide atinge a nave (fim de jogo).
+    global score, spawn_timer, ship_prev_x
     spawn_timer += 1
+    ship_prev_x = ship_pos[0]
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                shoot()
+    for _ in range(fire):
+        shoot()
 
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_LEFT]:
-        ship_pos[0] -= 4
-    if keys[pygame.K_RIGHT]:
-        ship_pos[0] += 4
+    if left:
+        ship_pos[0] -= SHIP_SPEED
+    if right:
+        ship_pos[0] += SHIP_SPEED
 
     ship_pos[0] = max(VIEWPORT.left+20, min(ship_pos[0], VIEWPORT.right-20))
 
     # Asteroides
-    if spawn_timer > 40:
-        asteroids.append(spawn_asteroid())
+    if spawn_timer > SPAWN_INTERVAL:
+        spawn_asteroid()
         spawn_timer = 0
 
-    for a in asteroids:
-        a["y"] += 3
-        if hit_ship(a):
-            game_over()
+    asteroids.move(0, ASTEROID_SPEED)
+    if hit_ship(asteroids.xs, asteroids.ys, asteroids.rs).any():
+        return False
 
     # Tiros
-    for s in shots:
-        s["y"] -= 8
-
-    # Colisão tiro-asteroide
-    for s in shots[:]:
-        for a in asteroids[:]:
-            if hit_asteroid(s, a):
-                shots.remove(s)
-                asteroids.remove(a)
-                score += 10
-                break
+    shots.move(0, -SHOT_SPEED)
+
+    # Colisão tiro-asteroide (grade uniforme + teste fino)
+    with profiler.stage("colisao"):
+        score += 10 * collide_shots(shots, asteroids)
+
+    # descarta o que saiu da viewport e remove tudo o que morreu neste tick
+    shots.kill(shots.ys <= VIEWPORT.top)
+    asteroids.kill(asteroids.ys >= VIEWPORT.bottom)
+    shots.sweep()
+    asteroids.sweep()
+    return True
+
+
+def reset_game(seed=None):
+    # volta o jogo ao estado inicial (e fixa a semente do random, se for passada)
+    global score, spawn_timer, ship_prev_x
+    if seed is not None:
+        random.seed(seed)
+    shots.clear()
+    asteroids.clear()
+    score = 0
+    spawn_timer = 0
+    ship_pos[:] = [VIEWPORT.centerx, VIEWPORT.bottom - 40]
+    ship_prev_x = ship_pos[0]
+    invalidate_screen()
 
-    shots = [s for s in shots if s["y"] > VIEWPORT.top]
-    asteroids = [a for a in asteroids if a["y"] < VIEWPORT.bottom]
 
-    # RENDER
-    screen.fill(BLACK)
+# =========================
+# RETÂNGULOS SUJOS
+# =========================
+# Com DIRTY_RECTS ligado, cada quadro apaga só as áreas desenhadas no quadro anterior e
+# manda para a tela (display.update) só essas áreas mais as do quadro atual, em vez de fill + flip da tela toda.
+DIRTY_RECTS = False
+FULL_REDRAW_FRACTION = 0.5   # se a área suja passar desta fração da tela, vale mais redesenhar tudo
+_retangulos_anteriores = None   # None: o próximo quadro limpa e envia a tela inteira
+
+def invalidate_screen():
+    # força o próximo quadro a redesenhar a tela inteira (ex.: ao voltar de um menu)
+    global _retangulos_anteriores
+    _retangulos_anteriores = None
+
+def frame_rects(ship_x, dy_tiros, dy_asteroides):
+    # caixas envolventes (bordas inclusivas, por isso o +1) de tudo o que o render desenha
+    rects = []
+    xs = [ship_x + p[0] for p in ship_model]
+    ys = [ship_pos[1] + p[1] for p in ship_model]
+    rects.append(pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1))
+    for x, y in zip(shots.xs.tolist(), (shots.ys + dy_tiros).tolist()):
+        rects.append(pygame.Rect(x, y - 8, 1, 9))
+    for x, y, r in zip(asteroids.xs.tolist(), (asteroids.ys + dy_asteroides).tolist(), asteroids.rs.tolist()):
+        rects.append(pygame.Rect(x - r, y - r, 2 * r + 1, 2 * r + 1))
+    rects.append(pygame.Rect(ZOOM_VIEWPORT.left, ZOOM_VIEWPORT.top, ZOOM_VIEWPORT.width + 1, ZOOM_VIEWPORT.height + 1))
+    # placar: cada dígito tem size de largura e 2*size de altura, com size + 10 entre eles
+    rects.append(pygame.Rect(50, 10, len(str(score)) * 25, 31))
+    tela = screen.get_rect()
+    return [r.clip(tela) for r in rects]
 
-    # Viewport
-    for x in range(VIEWPORT.left, VIEWPORT.right):
-        set_pixel(x, VIEWPORT.top, WHITE)
-        set_pixel(x, VIEWPORT.bottom, WHITE)
-    for y in range(VIEWPORT.top, VIEWPORT.bottom):
-        set_pixel(VIEWPORT.left, y, WHITE)
-        set_pixel(VIEWPORT.right, y, WHITE)
 
-    draw_ship()
-    draw_shots()
+# =========================
+# RENDERIZAÇÃO EM FAIXAS (PARALELA)
+# =========================
+# Com PARALLEL_BANDS > 0 a tela é dividida em faixas horizontais. O quadro vira uma lista de
+# comandos (cada um com as linhas que ocupa); cada faixa roda, em ordem, só os comandos que a
+# tocam, desenhando numa BandCanvas, e as faixas rodam juntas num pool de threads. Como cada
+# faixa só escreve nas suas linhas, o resultado é o mesmo do desenho em sequência.
+# Os preenchimentos por semente (flood/boundary fill) leem fora da própria faixa: esses vão como
+# comando serial, que termina as faixas pendentes e roda sozinho na tela inteira.
+PARALLEL_BANDS = 0
+BAND_ALIGN = 8   # altura das faixas múltipla disto, para o xadrez (x + y) % n continuar alinhado
+
+class BandRenderer:
+    def __init__(self, bandas, threads=None):
+        self.bandas = bandas
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=threads or bandas,
+                                                          thread_name_prefix="faixa")
+        self.comandos = []
+
+    def add(self, ymin, ymax, desenhar):
+        # desenhar(alvo) é chamado uma vez por faixa que cruza as linhas [ymin, ymax]
+        self.comandos.append((ymin, ymax, desenhar))
+
+    def serial(self, desenhar, alvo=None):
+        alvo = alvo or canvas
+        self.flush(alvo)
+        desenhar(alvo)
+
+    def faixas(self, alvo):
+        altura = -(-alvo.height // self.bandas)
+        altura = -(-altura // BAND_ALIGN) * BAND_ALIGN
+        return [(y, min(y + altura, alvo.height)) for y in range(0, alvo.height, altura)]
+
+    def flush(self, alvo=None):
+        alvo = alvo or canvas
+        comandos, self.comandos = self.comandos, []
+        if not comandos:
+            return
+        with alvo:
+            faixas = [BandCanvas(alvo, y0, y1) for y0, y1 in self.faixas(alvo)]
+            list(self.pool.map(self._desenhar_faixa, faixas, [comandos] * len(faixas)))
+        for faixa in faixas:
+            alvo.escritos += faixa.escritos
+            alvo.lidos += faixa.lidos
+
+    @staticmethod
+    def _desenhar_faixa(faixa, comandos):
+        for ymin, ymax, desenhar in comandos:
+            if ymin < faixa.y1 and ymax >= faixa.y0:
+                desenhar(faixa)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+_band_renderer = None
+
+def band_renderer():
+    # pool criado na primeira vez (e recriado se o número de faixas mudar)
+    global _band_renderer
+    if _band_renderer is None or _band_renderer.bandas != PARALLEL_BANDS:
+        if _band_renderer is not None:
+            _band_renderer.close()
+        _band_renderer = BandRenderer(PARALLEL_BANDS)
+    return _band_renderer
+
+
+def queue_frame(fila, ship_x, dy_tiros, dy_asteroides):
+    # os mesmos desenhos do render_serial, como comandos para as faixas
+    pos = (ship_x, ship_pos[1])
+    ys_nave = [pos[1] + p[1] for p in ship_model]
+    fila.add(min(ys_nave), max(ys_nave), in_viewport(lambda alvo: draw_ship(pos, alvo)))
+
+    if len(shots):
+        ys = shots.ys + dy_tiros
+        fila.add(int(ys.min()) - 8, int(ys.max()), in_viewport(lambda alvo: draw_shots(dy_tiros, alvo)))
+
+    for x, y, r in zip(asteroids.xs.tolist(), (asteroids.ys + dy_asteroides).tolist(), asteroids.rs.tolist()):
+        with entity_clip(canvas):
+            if canvas.box_outside(x - r, y - r, x + r, y + r):
+                continue
+        if asteroid_uses_sprite(x, y, r):
+            fila.add(y - r, y + r, in_viewport(lambda alvo, x=x, y=y, r=r: draw_asteroid_sprite(x, y, r, alvo)))
+        else:
+            fila.serial(in_viewport(lambda alvo, x=x, y=y, r=r: draw_asteroid(x, y, r, alvo)))
+
+    # a textura do zoom é montada aqui mesmo (noutro canvas); só a cópia dela vai para as faixas
+    rect = zoom_frame_rect()
+    textura = render_zoom_texture()
+    fila.add(rect.top, rect.bottom - 1, lambda alvo: alvo.copy_from_at(textura, rect.left, rect.top))
+
+    fila.add(10, 10 + 2 * 15, lambda alvo: draw_score(score, 50, 10, 15, YELLOW, alvo))
+
+
+# Com CLIP_VIEWPORT, nave, tiros e asteroides são recortados pela VIEWPORT (o que passa da borda
+# não aparece); desligado, o recorte é a tela inteira, como sempre foi.
+CLIP_VIEWPORT = False
+
+def entity_clip(alvo):
+    return alvo.clipped(VIEWPORT) if CLIP_VIEWPORT else contextlib.nullcontext(alvo)
+
+def in_viewport(desenhar):
+    # embrulha um comando das faixas para rodar com o recorte das entidades
+    def comando(alvo):
+        with entity_clip(alvo):
+            desenhar(alvo)
+    return comando
+
+
+def render_serial(ship_x, dy_tiros, dy_asteroides):
+    with entity_clip(canvas):
+        with profiler.stage("draw_ship"):
+            draw_ship((ship_x, ship_pos[1]))
+        with profiler.stage("draw_shots"):
+            draw_shots(dy_tiros)
+
+        with profiler.stage("asteroides"):
+            draw_asteroids(dy_asteroides)
+    with profiler.stage("zoom"):
+        draw_zoom_system() # Zoom de 2.5 vezes
+    with profiler.stage("draw_score"):
+        draw_score(score, 50, 10, 15, YELLOW)
+
+
+def render(alpha=1.0):
+    # desenha o estado atual; alpha (0..1) é quanto do próximo passo já passou desde o último update,
+    # então as entidades são desenhadas recuadas (1 - alpha) de um passo quando INTERPOLATE está ligado
+    global _retangulos_anteriores
+    atraso = (1 - alpha) if INTERPOLATE else 0
+    # a nave responde ao jogador: com LATE_INPUT ela aparece já onde o último passo a deixou
+    ship_x = ship_pos[0] if LATE_INPUT else round(ship_pos[0] + (ship_prev_x - ship_pos[0]) * atraso)
+    dy_tiros = round(SHOT_SPEED * atraso)
+    dy_asteroides = -round(ASTEROID_SPEED * atraso)
+
+    rects = None
+    tela_toda = True
+    if DIRTY_RECTS:
+        rects = frame_rects(ship_x, dy_tiros, dy_asteroides)
+        if _retangulos_anteriores is not None:
+            area = sum(r.w * r.h for r in rects) + sum(r.w * r.h for r in _retangulos_anteriores)
+            tela_toda = area > FULL_REDRAW_FRACTION * WIDTH * HEIGHT
+
+    # o fundo (tela preta + borda da viewport) vem da camada estática
+    with profiler.stage("fundo"):
+        fundo = background.get()
+        if tela_toda:
+            screen.blit(fundo, (0, 0))
+        else:
+            # só o que foi desenhado no quadro anterior precisa ser apagado
+            for r in _retangulos_anteriores:
+                screen.blit(fundo, r, r)
+
+    # a tela fica travada uma vez só durante todo o desenho das primitivas
+    with canvas:
+        if PARALLEL_BANDS:
+            fila = band_renderer()
+            with profiler.stage("comandos"):
+                queue_frame(fila, ship_x, dy_tiros, dy_asteroides)
+            with profiler.stage("faixas"):
+                fila.flush()
+        else:
+            render_serial(ship_x, dy_tiros, dy_asteroides)
+    if profiler.overlay:
+        painel = profiler.draw_overlay(screen)
+        if rects is not None and painel is not None:
+            rects.append(painel)
+    with profiler.stage("flip"):
+        if tela_toda:
+            pygame.display.flip()
+        else:
+            pygame.display.update(_retangulos_anteriores + rects)
+    if latency is not None:
+        latency.present()
+    if capture is not None:
+        with profiler.stage("captura"):
+            capture.grab(screen)
+    _retangulos_anteriores = rects
 
-    for a in asteroids:
-        draw_asteroid(a)
-    draw_zoom_system() # Zoom de 2.5 vezes
-    draw_score(score, 50, 10, 15, YELLOW)
-    pygame.display.flip()
 
+# =========================
+# CAPTURA DE QUADROS
+# =========================
+# Grava os quadros apresentados (depois do flip) sem parar o jogo para escrever em disco: o quadro
+# é copiado direto da memória da tela (get_view, sem criar Surface) para um buffer de um conjunto
+# fixo e vai por uma fila limitada para uma thread que converte e grava. A cópia é a única coisa
+# feita no loop; com a fila cheia o quadro é descartado (ou o mais antigo da fila, com "old").
+#   raw: um arquivo só, quadros RGB24 seguidos (ffmpeg -f rawvideo -pix_fmt rgb24 -s 640x480 -i ...)
+#   png: um arquivo por quadro, com o número do quadro no nome (buracos na numeração = pulados/descartados)
+#   y4m: vídeo YUV4MPEG2 4:2:0, abre em ffmpeg/mpv
+CAPTURE_FORMATS = ("raw", "png", "y4m")
+CAPTURE_QUEUE = 8   # quadros esperando a thread; cada um ocupa uma tela inteira (~1,2 MB)
+
+def capture_format(caminho):
+    # formato pela extensão do arquivo
+    ext = os.path.splitext(caminho)[1].lower()[1:]
+    return ext if ext in ("png", "y4m") else "raw"
+
+def png_bytes(rgb, nivel=3):
+    # PNG mínimo (RGB 8 bits, filtro "nenhum") feito com zlib, sem depender do pygame na thread
+    h, w, _ = rgb.shape
+    linhas = np.zeros((h, w * 3 + 1), dtype=np.uint8)   # cada linha começa com o byte do filtro
+    linhas[:, 1:] = rgb.reshape(h, w * 3)
+
+    def bloco(tipo, dados):
+        return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+    return (b"\x89PNG\r\n\x1a\n" + bloco(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+            + bloco(b"IDAT", zlib.compress(linhas.tobytes(), nivel)) + bloco(b"IEND", b""))
+
+def yuv420(rgb):
+    # RGB -> Y'CbCr BT.601 de faixa cheia (o "420jpeg" do y4m), croma na média de cada bloco 2x2
+    r, g, b = (rgb[..., i].astype(np.float32) for i in range(3))
+    y = 0.299 * r + 0.587 * g + 0.114 * b
+    cb = 128 - 0.168736 * r - 0.331264 * g + 0.5 * b
+    cr = 128 + 0.5 * r - 0.418688 * g - 0.081312 * b
+    h, w = y.shape
+    planos = [y]
+    for c in (cb, cr):
+        planos.append(c[:h // 2 * 2, :w // 2 * 2].reshape(h // 2, 2, w // 2, 2).mean(axis=(1, 3)))
+    return b"".join(np.clip(np.rint(p), 0, 255).astype(np.uint8).tobytes() for p in planos)
+
+class FrameCapture:
+    def __init__(self, superficie, caminho, formato=None, skip=0, fila=CAPTURE_QUEUE, descarte="new", fps=FPS):
+        if superficie.get_bytesize() != 4:
+            raise ValueError("a captura precisa de uma tela de 32 bits por pixel")
+        self.caminho = caminho
+        self.formato = formato or capture_format(caminho)
+        self.skip = max(skip, 0)
+        self.descarte = descarte
+        self.largura, self.altura = superficie.get_size()
+        self.deslocamentos = superficie.get_shifts()[:3]   # posição de R, G e B dentro do pixel
+        self.apresentados = 0   # quadros que passaram por grab (capturados ou não)
+        self.gravados = 0
+        self.descartados = 0    # fila cheia (contado no loop)
+        self.falhas = 0         # não gravados por erro de disco (contado na thread)
+        self.erro = None
+        forma = (self.altura, superficie.get_pitch())
+        # um buffer por lugar na fila + o que a thread está gravando: o loop nunca aloca nem espera
+        self._livres = collections.deque(np.empty(forma, dtype=np.uint8) for _ in range(fila + 1))
+        self._fila = queue.Queue(maxsize=fila)
+        self._rgb = np.empty((self.altura, self.largura, 3), dtype=np.uint8)
+        self._arquivo = None
+        if self.formato == "png":
+            pasta = os.path.dirname(caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+        else:
+            self._arquivo = open(caminho, "wb")
+            if self.formato == "y4m":
+                self._arquivo.write(f"YUV4MPEG2 W{self.largura} H{self.altura} F{fps}:{self.skip + 1} "
+                                    "Ip A1:1 C420jpeg\n".encode("ascii"))
+        self._thread = threading.Thread(target=self._escrever, name="captura", daemon=True)
+        self._thread.start()
+
+    def grab(self, superficie):
+        # chamado logo depois do flip; só copia a tela para um buffer livre e põe na fila
+        self.apresentados += 1
+        if (self.apresentados - 1) % (self.skip + 1):
+            return
+        if self._fila.full():
+            if self.descarte == "new":
+                self.descartados += 1
+                return
+            # "old": o quadro mais antigo que ainda não foi gravado cede o buffer para este. A fila fica
+            # travada entre conferir e tirar: se a thread pegou um quadro nesse meio-tempo já há lugar
+            # e nada é descartado
+            with self._fila.mutex:
+                if len(self._fila.queue) >= self._fila.maxsize:
+                    _, velho = self._fila.queue.popleft()
+                    self._livres.append(velho)
+                    self.descartados += 1
+        # só este loop põe na fila, então com ela sem estar cheia sempre há um buffer livre
+        buf = self._livres.pop()
+        np.copyto(buf, np.frombuffer(superficie.get_view("0"), dtype=np.uint8).reshape(buf.shape))
+        self._fila.put_nowait((self.apresentados, buf))
+
+    def _escrever(self):
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            numero, buf = item
+            try:
+                if self.erro is None:
+                    self._gravar(numero, self._para_rgb(buf))
+                    self.gravados += 1
+                else:
+                    self.falhas += 1
+            except OSError as e:
+                # disco cheio, pasta sumiu...: o jogo segue, os próximos quadros só são contados
+                self.erro = e
+                self.falhas += 1
+            finally:
+                self._livres.append(buf)
+
+    def _para_rgb(self, buf):
+        pixels = buf.view(np.uint32)[:, :self.largura]
+        for i, deslocamento in enumerate(self.deslocamentos):
+            self._rgb[..., i] = pixels >> deslocamento   # a conversão para uint8 fica com o byte de baixo
+        return self._rgb
+
+    def _gravar(self, numero, rgb):
+        if self.formato == "raw":
+            self._arquivo.write(rgb.data)
+        elif self.formato == "y4m":
+            self._arquivo.write(b"FRAME\n" + yuv420(rgb))
+        else:
+            base, ext = os.path.splitext(self.caminho)
+            with open(f"{base}_{numero:06d}{ext}", "wb") as f:
+                f.write(png_bytes(rgb))
+
+    def close(self):
+        # espera a fila esvaziar, fecha o arquivo e mostra quantos quadros foram gravados/perdidos
+        if self._thread is None:
+            return
+        self._fila.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._arquivo is not None:
+            self._arquivo.close()
+        print(f"captura: {self.gravados} quadros gravados em {self.caminho} ({self.formato}), "
+              f"{self.descartados} descartados com a fila cheia")
+        if self.erro is not None:
+            print(f"captura interrompida: {self.erro} ({self.falhas} quadros não gravados)")
+
+
+capture = None   # FrameCapture ligada por --capture, ou None
+
+
+# =========================
+# RECURSOS (FONTES E SONS)
+# =========================
+# Fontes e arquivos de som são carregados numa thread enquanto a intro roda. Os sons ficam
+# em memória, então trocar de música é só ler do cache; o mixer só é usado na thread principal
+# (em update(), chamado a cada quadro), e uma troca pedida antes do arquivo ficar pronto
+# espera sem travar o quadro.
+FONTES = {
+    "titulo": ("arial", 42, True),
+    "instrucao": ("arial", 24, False),
+}
+
+class AssetManager:
+    def __init__(self, pasta="Sounds"):
+        self.pasta = pasta
+        self.fontes = {}
+        self.sons = {}          # nome do arquivo -> bytes
+        self.erros = {}         # nome -> exceção, para quem quiser saber o que falhou
+        self.musica_atual = None
+        self._pedido = None
+        self._tocando = None
+        self._pronto = threading.Event()
+        self._thread = None
+
+    def start(self, primeiro=()):
+        # `primeiro`: arquivos de som que devem sair antes dos outros (ex.: a música da intro)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._carregar, args=(tuple(primeiro),),
+                                            name="assets", daemon=True)
+            self._thread.start()
+
+    def _carregar(self, primeiro):
+        try:
+            arquivos = sorted(os.listdir(self.pasta))
+        except OSError as e:
+            self.erros[self.pasta] = e
+            arquivos = []
+        for nome in [n for n in primeiro if n in arquivos] + [n for n in arquivos if n not in primeiro]:
+            try:
+                with open(os.path.join(self.pasta, nome), "rb") as f:
+                    self.sons[nome] = f.read()
+            except OSError as e:
+                self.erros[nome] = e
+        for nome, (familia, tamanho, negrito) in FONTES.items():
+            self.fontes[nome] = pygame.font.SysFont(familia, tamanho, bold=negrito)
+        self._pronto.set()
+
+    def wait(self, timeout=None):
+        # sem thread (ninguém chamou start) carrega tudo aqui mesmo
+        if self._thread is None:
+            self._carregar(())
+        return self._pronto.wait(timeout)
+
+    def font(self, nome):
+        if nome not in self.fontes:
+            self.wait()
+        return self.fontes[nome]
+
+    def play_music(self, nome, volume=0.5):
+        # pede a troca de música; ela começa agora se o arquivo já estiver em memória,
+        # senão no primeiro update() depois que a thread terminar de ler
+        if nome != self.musica_atual:
+            self._pedido = (nome, volume)
+            self.update()
+
+    def pending(self):
+        # há uma troca de música esperando o arquivo
+        return self._pedido is not None
+
+    def update(self):
+        if self._pedido is None or pygame.mixer.get_init() is None:
+            return
+        nome, volume = self._pedido
+        dados = self.sons.get(nome)
+        if dados is None:
+            if nome in self.erros or self._pronto.is_set():
+                self._pedido = None   # o arquivo não existe ou falhou: desiste da troca
+            return
+        # o mixer vai lendo do arquivo em memória enquanto toca, então ele fica guardado
+        self._tocando = io.BytesIO(dados)
+        pygame.mixer.music.load(self._tocando, os.path.splitext(nome)[1][1:])
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)   # loop infinito
+        self.musica_atual = nome
+        self._pedido = None
+
+
+assets = AssetManager()
+
+def load_fonts():
+    # troca as fontes globais pelas do cache (espera a thread, se ela ainda não acabou)
+    global fonte_titulo, fonte_instrucao
+    fonte_titulo = assets.font("titulo")
+    fonte_instrucao = assets.font("instrucao")
+
+
+# =========================
+# INICIALIZAÇÃO
+# =========================
+def init(headless=False):
+    # headless: drivers "dummy" do SDL (sem janela e sem som), útil para simular sem display
+    global screen, canvas, clock
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Nave vs Asteroides - CG")
+    clock = pygame.time.Clock()
+    canvas = Canvas(screen)
+
+    # =========================
+    # MÚSICA E SONS
+    # =========================
+    # a música da intro é lida primeiro; o resto (música do jogo e fontes) vem enquanto a intro roda.
+    # Sem intro (headless), as fontes são carregadas já, pois não há nada para esconder a espera.
+    assets.start(primeiro=["capcom.mp3"])
+    if headless:
+        load_fonts()
+
+
+# =========================
+# LATÊNCIA DE ENTRADA
+# =========================
+# O pygame não diz quando a tecla foi apertada, só quando o evento foi lido. Então cada entrada
+# (tiro ou mudança de esquerda/direita) leva o instante da leitura em que apareceu e o da leitura
+# anterior; quando o passo que a usou chega na tela (fim do flip), ficam duas medidas:
+#   leitura: da leitura até a tela (o mínimo que a entrada esperou)
+#   limite:  da leitura anterior até a tela (o máximo: a tecla pode ter sido apertada logo depois dela)
+class LatencyTracker:
+    def __init__(self, capacity=10000):
+        self.amostras = collections.defaultdict(lambda: collections.deque(maxlen=capacity))
+        self._leitura = self._leitura_anterior = time.perf_counter()
+        self._teclas = (False, False)
+        self._lidas = []       # entradas lidas que nenhum passo usou ainda
+        self._simuladas = []   # entradas já usadas por um passo, esperando o próximo flip
+
+    def sample(self):
+        # chamado a cada leitura dos eventos
+        self._leitura_anterior, self._leitura = self._leitura, time.perf_counter()
+
+    def input(self, tipo):
+        self._lidas.append((tipo, self._leitura, self._leitura_anterior))
+
+    def keys(self, left, right):
+        # só a mudança do estado das setas conta (começar ou parar de mover)
+        if (left, right) != self._teclas:
+            self._teclas = (left, right)
+            self.input("movimento")
+
+    def stepped(self):
+        self._simuladas += self._lidas
+        self._lidas = []
+
+    def present(self):
+        agora = time.perf_counter()
+        for tipo, leitura, anterior in self._simuladas:
+            self.amostras[tipo, "leitura"].append((agora - leitura) * 1000)
+            self.amostras[tipo, "limite"].append((agora - anterior) * 1000)
+        self._simuladas = []
+
+    def report(self):
+        print(f"{'latência entrada->tela (ms)':28s}{'n':>7s}{'p50':>8s}{'p95':>8s}{'p99':>8s}{'max':>8s}")
+        for (tipo, medida), valores in sorted(self.amostras.items()):
+            p50, p95, p99 = np.percentile(valores, (50, 95, 99))
+            print(f"{tipo + ' (' + medida + ')':28s}{len(valores):7d}{p50:8.2f}{p95:8.2f}{p99:8.2f}{max(valores):8.2f}")
+
+
+latency = None   # LatencyTracker ligado por --latency, ou None
+
+
+# =========================
+# LOOP PRINCIPAL
+# =========================
+def read_input():
+    # lê os eventos pendentes e o estado das setas; devolve (esquerda, direita, tiros desde a última leitura)
+    tiros = 0
+    if latency is not None:
+        latency.sample()
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                tiros += 1
+                if latency is not None:
+                    latency.input("tiro")
+            elif event.key == pygame.K_F3:
+                # liga/desliga o painel do profiler (e a medição, se ainda não estava ligada)
+                profiler.overlay = not profiler.overlay
+                profiler.enabled = profiler.enabled or profiler.overlay
+
+    keys = pygame.key.get_pressed()
+    if latency is not None:
+        latency.keys(keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+    return keys[pygame.K_LEFT], keys[pygame.K_RIGHT], tiros
+
+def run_game():
+    acumulador = 0.0
+    tiros_pendentes = 0
+    anterior = time.perf_counter()
+
+    while True:
+        clock.tick(FPS)
+        agora = time.perf_counter()
+        acumulador += agora - anterior
+        anterior = agora
+        profiler.begin_frame()
+
+        with profiler.stage("eventos"):
+            left, right, tiros = read_input()
+            tiros_pendentes += tiros
+        assets.update()
+
+        # roda quantos passos fixos couberem no tempo acumulado (no máximo MAX_CATCHUP)
+        passos = 0
+        with profiler.stage("simulacao"):
+            while acumulador >= SIM_DT and passos < MAX_CATCHUP:
+                if LATE_INPUT:
+                    # lê de novo logo antes do passo: o que chegou depois da leitura do começo do quadro já entra
+                    left, right, tiros = read_input()
+                    tiros_pendentes += tiros
+                vivo = update(left, right, tiros_pendentes)
+                if latency is not None:
+                    latency.stepped()
+                if recorder is not None:
+                    recorder.add(left, right, tiros_pendentes)
+                if not vivo:
+                    game_over()
+                tiros_pendentes = 0
+                acumulador -= SIM_DT
+                passos += 1
+        # se ainda sobrou atraso, ele é descartado: o jogo fica mais lento em vez de travar tentando alcançar
+        if passos == MAX_CATCHUP:
+            acumulador = min(acumulador, SIM_DT)
+
+        render(acumulador / SIM_DT)
+        profiler.end_frame()
+
+
+def run_headless(max_ticks, draw=True):
+    # sem intro, menus nem limite de FPS: um passo de simulação por volta, o mais rápido possível.
+    # Sem teclado, a nave fica parada; termina no fim de jogo ou depois de max_ticks passos.
+    inicio = time.perf_counter()
+    ticks = 0
+    while ticks < max_ticks:
+        ticks += 1
+        profiler.begin_frame()
+        with profiler.stage("simulacao"):
+            vivo = update()
+        if recorder is not None:
+            recorder.add(False, False, 0)
+        if not vivo:
+            break
+        if draw:
+            render()
+        profiler.end_frame()
+    duracao = time.perf_counter() - inicio
+    print(f"score={score} ticks={ticks} tempo={duracao:.3f}s ticks/s={ticks / max(duracao, 1e-9):.1f}")
+    return ticks
+
+
+# =========================
+# GRAVAÇÃO E REPLAY
+# =========================
+# A simulação só depende da semente do random e da entrada de cada passo, então uma partida
+# gravada (semente + entrada por passo) roda de novo exatamente igual. O replay serve como
+# carga repetível para medir desempenho e para conferir que uma otimização não mudou o jogo.
+class InputRecording:
+    # arquivo: cabeçalho (marca, semente, passos, score final) + um byte por passo comprimido com zlib;
+    # no byte, bit 0 = esquerda, bit 1 = direita e os bits 2-7 = tiros naquele passo (até 63)
+    MARCA = b"GIR1"
+    CABECALHO = struct.Struct("<4sqII")
+
+    def __init__(self, seed, entradas=b"", score=None):
+        self.seed = seed
+        self.entradas = bytearray(entradas)
+        self.score = score
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def add(self, left, right, fire):
+        self.entradas.append(bool(left) | bool(right) << 1 | min(fire, 63) << 2)
+
+    def __iter__(self):
+        for b in self.entradas:
+            yield bool(b & 1), bool(b & 2), b >> 2
+
+    def save(self, path, final_score=None):
+        # o score final vai junto para o replay poder conferir o resultado
+        self.score = score if final_score is None else final_score
+        with open(path, "wb") as f:
+            f.write(self.CABECALHO.pack(self.MARCA, self.seed, len(self.entradas), self.score))
+            f.write(zlib.compress(bytes(self.entradas), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            dados = f.read()
+        if len(dados) < cls.CABECALHO.size:
+            raise ValueError(f"{path}: arquivo de gravação incompleto")
+        marca, seed, passos, final = cls.CABECALHO.unpack_from(dados)
+        if marca != cls.MARCA:
+            raise ValueError(f"{path}: não é uma gravação do jogo")
+        entradas = zlib.decompress(dados[cls.CABECALHO.size:])
+        if len(entradas) != passos:
+            raise ValueError(f"{path}: esperava {passos} passos, achou {len(entradas)}")
+        return cls(seed, entradas, final)
+
+
+recorder = None   # InputRecording sendo gravada (--record), ou None
+
+
+def run_replay(gravacao, draw=True):
+    # reexecuta a partida gravada sem limite de FPS; devolve True se terminou igual à gravação
+    reset_game(gravacao.seed)
+    inicio = time.perf_counter()
+    ticks = 0
+    for left, right, fire in gravacao:
+        ticks += 1
+        profiler.begin_frame()
+        with profiler.stage("simulacao"):
+            vivo = update(left, right, fire)
+        if not vivo:
+            break
+        if draw:
+            render()
+        profiler.end_frame()
+    duracao = time.perf_counter() - inicio
+    print(f"score={score} ticks={ticks} tempo={duracao:.3f}s ticks/s={ticks / max(duracao, 1e-9):.1f}")
+    igual = score == gravacao.score and ticks == len(gravacao)
+    if igual:
+        print("replay confere com a gravação")
+    else:
+        print(f"replay DIVERGIU: gravação tem score={gravacao.score} ticks={len(gravacao)}")
+    return igual
+
+
+def main(argv=None):
+    global DIRTY_RECTS, ZOOM_MAGNIFICATION, ZOOM_ALL_ENTITIES, SPRITES, SPRITE_ANGLE_STEP, PARALLEL_BANDS, CLIP_VIEWPORT
+    global MENU_FPS, LATE_INPUT
+    global recorder, capture, latency
+    parser = argparse.ArgumentParser(description="Galactic Impact - Nave vs Asteroides")
+    parser.add_argument("--headless", action="store_true",
+                        help="sem janela e sem som, pula intro/menus e roda sem limite de FPS")
+    parser.add_argument("--ticks", type=int, default=3600,
+                        help="máximo de passos de simulação no modo headless (padrão: 3600)")
+    parser.add_argument("--no-render", action="store_true",
+                        help="no modo headless, só simula (não desenha)")
+    parser.add_argument("--seed", type=int, default=None, help="semente do gerador aleatório")
+    parser.add_argument("--record", metavar="ARQUIVO",
+                        help="grava a semente e a entrada de cada passo da partida neste arquivo")
+    parser.add_argument("--replay", metavar="ARQUIVO",
+                        help="reexecuta uma partida gravada sem janela e o mais rápido possível")
+    parser.add_argument("--menu-fps", type=float, default=MENU_FPS, metavar="N",
+                        help="máximo de acordadas por segundo das telas paradas (menu, instruções) (padrão: %(default)s)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="apaga e atualiza só as áreas que mudaram, em vez da tela inteira")
+    parser.add_argument("--clip-viewport", action="store_true",
+                        help="recorta nave, tiros e asteroides pela viewport (nada passa da borda)")
+    parser.add_argument("--parallel", type=int, default=0, metavar="N",
+                        help="desenha o quadro em N faixas horizontais, em paralelo (padrão: 0, desligado)")
+    parser.add_argument("--zoom-mag", type=float, default=None, metavar="X",
+                        help="ampliação do zoom (padrão: janela fixa de 120x120 do mundo)")
+    parser.add_argument("--zoom-all", action="store_true", help="mostra também os asteroides no zoom")
+    parser.add_argument("--no-sprites", action="store_true",
+                        help="desenha nave detalhada e asteroides direto, sem o cache de sprites")
+    parser.add_argument("--sprite-step", type=float, default=SPRITE_ANGLE_STEP, metavar="GRAUS",
+                        help="passo de quantização do ângulo dos sprites; 0 desenha a nave detalhada sem cache "
+                             "(padrão: %(default)s)")
+    parser.add_argument("--capture", metavar="ARQUIVO",
+                        help="grava os quadros apresentados numa thread; o formato vem da extensão (.y4m, .png, senão raw)")
+    parser.add_argument("--capture-format", choices=CAPTURE_FORMATS, help="formato da captura, no lugar da extensão")
+    parser.add_argument("--capture-skip", type=int, default=0, metavar="K",
+                        help="grava 1 a cada K+1 quadros apresentados (padrão: 0, todos)")
+    parser.add_argument("--capture-queue", type=int, default=CAPTURE_QUEUE, metavar="N",
+                        help="quadros que podem esperar a gravação (padrão: %(default)s)")
+    parser.add_argument("--capture-drop", choices=("new", "old"), default="new",
+                        help="com a fila cheia, descarta o quadro novo ou o mais antigo da fila (padrão: %(default)s)")
+    parser.add_argument("--latency", action="store_true",
+                        help="mede a latência entre ler uma tecla e o quadro com o resultado chegar na tela (mostra ao sair)")
+    parser.add_argument("--late-input", action="store_true",
+                        help="lê o teclado logo antes de cada passo e desenha a nave sem o recuo da interpolação")
+    parser.add_argument("--profile", action="store_true",
+                        help="mede o tempo de cada etapa do quadro (F3 mostra o painel durante o jogo)")
+    parser.add_argument("--profile-csv", metavar="ARQUIVO",
+                        help="ao sair, salva o histórico do profiler neste CSV (liga o --profile)")
+    args = parser.parse_args(argv)
+    if args.sprite_step < 0:
+        parser.error("--sprite-step não pode ser negativo")
+
+    DIRTY_RECTS = args.dirty_rects
+    PARALLEL_BANDS = max(args.parallel, 0)
+    CLIP_VIEWPORT = args.clip_viewport
+    MENU_FPS = max(args.menu_fps, 1)
+    LATE_INPUT = args.late_input
+    ZOOM_MAGNIFICATION = args.zoom_mag
+    ZOOM_ALL_ENTITIES = args.zoom_all
+    SPRITES = not args.no_sprites
+    SPRITE_ANGLE_STEP = args.sprite_step
+
+    gravacao = InputRecording.load(args.replay) if args.replay else None
+    if args.record:
+        # sem --seed, sorteia uma para a partida poder ser repetida
+        if args.seed is None:
+            args.seed = random.randrange(2 ** 63)
+        recorder = InputRecording(args.seed)
+        # salvo no atexit porque o jogo termina por sys.exit (fim de jogo ou fechar a janela)
+        atexit.register(recorder.save, args.record)
+
+    # o replay sempre roda sem janela
+    init(headless=args.headless or gravacao is not None)
+    reset_game(args.seed)
+
+    profiler.enabled = args.profile or bool(args.profile_csv)
+    if args.profile_csv:
+        # o jogo sai por sys.exit em vários lugares (fechar janela, fim de jogo), então o CSV é salvo no atexit
+        atexit.register(profiler.dump_csv, args.profile_csv)
+
+    if args.capture:
+        capture = FrameCapture(screen, args.capture, args.capture_format, args.capture_skip,
+                               max(args.capture_queue, 1), args.capture_drop)
+        # como o CSV do profiler: o jogo pode sair por sys.exit, então a fila é esvaziada no atexit
+        atexit.register(capture.close)
+    if args.latency:
+        latency = LatencyTracker()
+        atexit.register(latency.report)
+
+    if gravacao is not None:
+        igual = run_replay(gravacao, draw=not args.no_render)
+        pygame.quit()
+        return 0 if igual else 1
+
+    if args.headless:
+        run_headless(args.ticks, draw=not args.no_render)
+        pygame.quit()
+        return 0
+
+    intro_logo()
+    load_fonts()
+    instructions()
+    menu()
+    # a partida começa aqui: a semente é fixada de novo (a gravação começa deste estado)
+    # e o reset também limpa a tela toda que os menus desenharam
+    reset_game(args.seed)
+    run_game()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
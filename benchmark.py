@@ -0,0 +1,229 @@
+# =========================
+# BENCHMARK DAS PRIMITIVAS DE RASTERIZAÇÃO
+# =========================
+# Mede cada primitiva do asteroides.py desenhando numa superfície fora da tela
+# e guarda o resultado em JSON para comparar antes/depois de uma otimização.
+#
+#   py benchmark.py --output antes.json
+#   py benchmark.py --compare antes.json --output depois.json
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import asteroides as jogo
+
+BLACK, WHITE, GRAY, BLUE = jogo.BLACK, jogo.WHITE, jogo.GRAY, jogo.BLUE
+CX, CY = jogo.WIDTH // 2, jogo.HEIGHT // 2
+
+
+# =========================
+# CASOS
+# =========================
+# Cada caso é (nome, preparo, operação). O preparo roda antes de cada chamada e não entra
+# na medição (por exemplo, desenhar o contorno que o preenchimento vai encher).
+
+def limpar():
+    jogo.canvas.fill_rect((0, 0, jogo.WIDTH, jogo.HEIGHT), BLACK)
+
+
+def casos_linhas():
+    casos = []
+    # um segmento por octante (direção do eixo maior e sinal de cada eixo), em 3 tamanhos
+    direcoes = [(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)]
+    for octante, (ux, uy) in enumerate(direcoes):
+        for tamanho in (8, 64, 200):
+            n = max(abs(ux), abs(uy))
+            x1 = CX + ux * tamanho // n
+            y1 = CY + uy * tamanho // n
+            casos.append((f"draw_line/oct{octante}/len{tamanho}", limpar,
+                          lambda x1=x1, y1=y1: jogo.draw_line(CX, CY, x1, y1, WHITE)))
+    return casos
+
+
+def casos_lote():
+    # draw_lines com muitos segmentos de uma vez (como tiros e dígitos do placar)
+    rng = np.random.default_rng(0)
+    casos = []
+    for qtd in (16, 256):
+        segs = rng.integers(0, [jogo.WIDTH, jogo.HEIGHT, jogo.WIDTH, jogo.HEIGHT], size=(qtd, 4))
+        casos.append((f"draw_lines/{qtd}seg", limpar, lambda segs=segs: jogo.draw_lines(segs, WHITE)))
+    return casos
+
+
+def casos_curvas():
+    casos = []
+    for r in (15, 60, 200):
+        casos.append((f"draw_circle/r{r}", limpar, lambda r=r: jogo.draw_circle(CX, CY, r, WHITE)))
+    for rx, ry in ((30, 20), (180, 100), (300, 220)):
+        casos.append((f"draw_ellipse/{rx}x{ry}", limpar, lambda rx=rx, ry=ry: jogo.draw_ellipse(CX, CY, rx, ry, WHITE)))
+    return casos
+
+
+def casos_preenchimento():
+    casos = []
+    for r in (15, 60):
+        def contorno(r=r):
+            limpar()
+            jogo.draw_circle(CX, CY, r, WHITE)
+        casos.append((f"flood_fill/circle_r{r}", contorno,
+                      lambda: jogo.flood_fill(CX, CY, BLACK, GRAY)))
+        casos.append((f"boundary_fill/circle_r{r}", contorno,
+                      lambda: jogo.boundary_fill(CX, CY, BLUE, WHITE)))
+
+    nave = [(CX - 10, CY + 10), (CX, CY - 15), (CX + 10, CY + 10)]
+    grande = [(CX - 200, CY + 150), (CX - 50, CY - 180), (CX + 220, CY - 100), (CX + 120, CY + 190), (CX, CY + 40)]
+    casos.append(("scanline_fill/ship", limpar, lambda: jogo.scanline_fill(nave, BLUE)))
+    casos.append(("scanline_fill/large_concave", limpar, lambda: jogo.scanline_fill(grande, BLUE)))
+    return casos
+
+
+def casos_recorte():
+    rect = jogo.ZOOM_VIEWPORT
+    return [
+        ("draw_line_clipped/inside", limpar,
+         lambda: jogo.draw_line_clipped(rect.left + 5, rect.top + 5, rect.right - 5, rect.bottom - 5, rect, WHITE)),
+        ("draw_line_clipped/crossing", limpar,
+         lambda: jogo.draw_line_clipped(rect.left - 100, rect.top - 50, rect.right + 100, rect.bottom + 50, rect, WHITE)),
+        ("draw_line_clipped/outside", limpar,
+         lambda: jogo.draw_line_clipped(0, 0, 100, 50, rect, WHITE)),
+    ]
+
+
+def casos_zoom():
+    def com_tiros(qtd):
+        def preparo():
+            limpar()
+            jogo.reset_game(0)
+            for i in range(qtd):
+                jogo.shots.add(jogo.ship_pos[0] + (i % 7 - 3) * 6, jogo.ship_pos[1] - 15 - (i * 9) % 120)
+        return preparo
+    return [(f"draw_zoom_system/{qtd}shots", com_tiros(qtd), jogo.draw_zoom_system) for qtd in (0, 50)]
+
+
+def todos_os_casos():
+    return casos_linhas() + casos_lote() + casos_curvas() + casos_preenchimento() + casos_recorte() + casos_zoom()
+
+
+# =========================
+# MEDIÇÃO
+# =========================
+def pixels_por_chamada(preparo, operacao):
+    # quantos pixels a operação muda sozinha: compara a superfície antes e depois de uma chamada
+    preparo()
+    with jogo.canvas:
+        antes = jogo.canvas.pixels.copy()
+    operacao()
+    with jogo.canvas:
+        return int(np.count_nonzero(jogo.canvas.pixels != antes))
+
+
+def medir(preparo, operacao, min_time, repeat):
+    # repete a operação até somar min_time segundos (só o tempo da operação conta);
+    # faz isso `repeat` vezes e fica com a melhor rodada, que é a menos afetada por ruído
+    melhor = None
+    for _ in range(repeat):
+        total, chamadas = 0.0, 0
+        while total < min_time:
+            preparo()
+            with jogo.canvas:
+                inicio = time.perf_counter()
+                operacao()
+                total += time.perf_counter() - inicio
+            chamadas += 1
+        por_chamada = total / chamadas
+        if melhor is None or por_chamada < melhor:
+            melhor = por_chamada
+    return melhor
+
+
+def rodar(filtro=None, min_time=0.2, repeat=3):
+    resultados = {}
+    for nome, preparo, operacao in todos_os_casos():
+        if filtro and filtro not in nome:
+            continue
+        pixels = pixels_por_chamada(preparo, operacao)
+        por_chamada = medir(preparo, operacao, min_time, repeat)
+        resultados[nome] = {
+            "us_per_call": por_chamada * 1e6,
+            "calls_per_s": 1 / por_chamada,
+            "pixels_per_call": pixels,
+            "pixels_per_s": pixels / por_chamada,
+        }
+        print(f"{nome:40s} {por_chamada * 1e6:12.2f} us/call {1 / por_chamada:12.0f} calls/s "
+              f"{pixels / por_chamada:14.0f} px/s")
+    return resultados
+
+
+def comparar(resultados, base, limite):
+    # marca como regressão todo caso que ficou mais de `limite` (fração) mais lento que a base
+    regressoes = []
+    for nome, atual in resultados.items():
+        anterior = base.get("results", {}).get(nome)
+        if anterior is None:
+            continue
+        razao = anterior["us_per_call"] / atual["us_per_call"]
+        marca = ""
+        if razao < 1 - limite:
+            marca = "  <-- REGRESSÃO"
+            regressoes.append(nome)
+        print(f"{nome:40s} {anterior['us_per_call']:10.2f} -> {atual['us_per_call']:10.2f} us  x{razao:6.2f}{marca}")
+    return regressoes
+
+
+def metadados():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                         stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das primitivas de rasterização")
+    parser.add_argument("--output", help="arquivo JSON onde salvar os resultados")
+    parser.add_argument("--compare", help="JSON de uma rodada anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="quanto mais lento (fração) conta como regressão (padrão: 0.10)")
+    parser.add_argument("--filter", help="roda só os casos cujo nome contém este texto")
+    parser.add_argument("--min-time", type=float, default=0.2, help="segundos medidos por rodada de cada caso")
+    parser.add_argument("--repeat", type=int, default=3, help="rodadas por caso (vale a melhor)")
+    args = parser.parse_args(argv)
+
+    jogo.init(headless=True)
+    # tudo é desenhado numa superfície fora da tela, não na tela do jogo
+    jogo.canvas = jogo.Canvas(pygame.Surface((jogo.WIDTH, jogo.HEIGHT)))
+
+    resultados = rodar(args.filter, args.min_time, args.repeat)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadados(), "results": resultados}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        print()
+        regressoes = comparar(resultados, base, args.threshold)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) acima de {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
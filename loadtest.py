@@ -0,0 +1,217 @@
+# =========================
+# TESTE DE CARGA (ESCALA E VAZAMENTO)
+# =========================
+# Roda o jogo sem janela com cada vez mais asteroides e tiros na tela, um degrau por vez, e mede
+# o tempo de quadro (update + render) e a memória (tracemalloc) em cada degrau. Serve para achar
+# o "joelho" (a partir de quantas entidades o quadro estoura o orçamento de 1/FPS) e para pegar
+# vazamento nas listas de tiros/asteroides em sessões longas.
+#
+#   py loadtest.py --output carga.json
+#   py loadtest.py --asteroids 50 --shots 4 --duration 600 --output soak.json   # sessão longa
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import asteroides as jogo
+from benchmark import metadados
+
+ASTEROIDES_PADRAO = "10,25,50,100,200,400,800"
+ASTEROIDES_POR_TIRO = 25   # sem --shots, cada degrau dispara 1 tiro por passo a cada 25 asteroides
+
+
+# =========================
+# GERAÇÃO DE CARGA
+# =========================
+# O spawn do jogo (a cada SPAWN_INTERVAL passos) fica desligado durante o teste: o gerador repõe
+# os asteroides até a meta de cada degrau e dispara `tiros` por passo em colunas sorteadas. A nave
+# fica parada e nenhum asteroide nasce na coluna dela; se mesmo assim um passo acusar colisão
+# (update() devolve False e pula tiros, colisões e limpeza), ele é contado em "game_over_ticks".
+
+def coluna_livre(rng):
+    # x sorteado fora do alcance da nave (o mesmo do hit_ship, com folga)
+    afastamento = 15 + 12 + 2
+    while True:
+        x = rng.randint(jogo.VIEWPORT.left + 20, jogo.VIEWPORT.right - 20)
+        if abs(x - jogo.ship_pos[0]) >= afastamento:
+            return x
+
+
+def repor_asteroides(rng, meta, espalhar=False):
+    # espalhar: no começo do degrau os asteroides entram em toda a altura, não todos no topo
+    while len(jogo.asteroids) < meta:
+        y = rng.randint(jogo.VIEWPORT.top, jogo.VIEWPORT.bottom - 1) if espalhar else jogo.VIEWPORT.top
+        jogo.asteroids.add(coluna_livre(rng), y, 15)
+
+
+def disparar(rng, tiros):
+    for _ in range(tiros):
+        jogo.shots.add(rng.randint(jogo.VIEWPORT.left + 5, jogo.VIEWPORT.right - 5), jogo.ship_pos[1] - 15)
+
+
+# =========================
+# MEDIÇÃO
+# =========================
+def resumo(valores):
+    valores = np.asarray(valores, dtype=np.float64)
+    if len(valores) == 0:
+        return None
+    p50, p95, p99 = np.percentile(valores, (50, 95, 99))
+    return {"p50": p50, "p95": p95, "p99": p99, "max": float(valores.max()), "mean": float(valores.mean())}
+
+
+def rodar_degrau(rng, meta, tiros, duracao, desenhar, memoria, amostra_memoria=1.0):
+    # o gerador é a única fonte de asteroides: durante o degrau o spawn do jogo nunca chega na vez
+    spawn_original = jogo.SPAWN_INTERVAL
+    jogo.SPAWN_INTERVAL = float("inf")
+    try:
+        return medir_degrau(rng, meta, tiros, duracao, desenhar, memoria, amostra_memoria)
+    finally:
+        jogo.SPAWN_INTERVAL = spawn_original
+
+
+def medir_degrau(rng, meta, tiros, duracao, desenhar, memoria, amostra_memoria):
+    jogo.reset_game(rng.randrange(2 ** 31))
+    repor_asteroides(rng, meta, espalhar=True)
+    jogo.profiler.history.clear()
+
+    if memoria:
+        tracemalloc.reset_peak()
+        mem_inicio = tracemalloc.get_traced_memory()[0]
+    amostras = []
+    quadros, qtd_asteroides, qtd_tiros = [], [], []
+    colisoes = 0
+    inicio = proxima_amostra = time.perf_counter()
+    while time.perf_counter() - inicio < duracao:
+        t0 = time.perf_counter()
+        jogo.profiler.begin_frame()
+        repor_asteroides(rng, meta)
+        disparar(rng, tiros)
+        with jogo.profiler.stage("simulacao"):
+            if not jogo.update():
+                colisoes += 1
+        if desenhar:
+            jogo.render()
+        jogo.profiler.end_frame()
+        agora = time.perf_counter()
+        quadros.append((agora - t0) * 1000)
+        qtd_asteroides.append(len(jogo.asteroids))
+        qtd_tiros.append(len(jogo.shots))
+        if memoria and agora >= proxima_amostra:
+            amostras.append((round(agora - inicio, 3), tracemalloc.get_traced_memory()[0]))
+            proxima_amostra = agora + amostra_memoria
+
+    resultado = {
+        "asteroids_target": meta,
+        "shots_per_tick": tiros,
+        "ticks": len(quadros),
+        "seconds": time.perf_counter() - inicio,
+        "asteroids_mean": float(np.mean(qtd_asteroides)),
+        "shots_mean": float(np.mean(qtd_tiros)),
+        "game_over_ticks": colisoes,   # passos que acabaram em colisão com a nave (deveria ser 0)
+        "frame_ms": resumo(quadros),
+        "fps": len(quadros) / max(sum(quadros) / 1000, 1e-9),
+        # por etapa, só dos últimos quadros que cabem no histórico do profiler
+        "stages_ms": {nome: dict(zip(("p50", "p95", "p99"), valores))
+                      for nome, valores in jogo.profiler.percentiles().items()},
+    }
+    if memoria:
+        mem_fim, pico = tracemalloc.get_traced_memory()
+        resultado["memory"] = {
+            "start_bytes": mem_inicio,
+            "end_bytes": mem_fim,
+            "growth_bytes": mem_fim - mem_inicio,
+            "peak_bytes": pico,
+            "samples": amostras,   # (segundos, bytes) para ver se a memória sobe ao longo do degrau
+        }
+    return resultado
+
+
+def joelho(degraus, orcamento_ms):
+    # primeiro degrau cujo p95 passa do orçamento de um quadro
+    for degrau in degraus:
+        if degrau["frame_ms"]["p95"] > orcamento_ms:
+            return degrau["asteroids_target"]
+    return None
+
+
+def lista_de_inteiros(texto):
+    return [int(v) for v in texto.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga: tempo de quadro e memória por quantidade de entidades")
+    parser.add_argument("--asteroids", default=ASTEROIDES_PADRAO,
+                        help=f"asteroides na tela em cada degrau, separados por vírgula (padrão: {ASTEROIDES_PADRAO})")
+    parser.add_argument("--shots", default=None,
+                        help="tiros por passo em cada degrau; um valor só vale para todos "
+                             f"(padrão: 1 a cada {ASTEROIDES_POR_TIRO} asteroides, no mínimo 1)")
+    parser.add_argument("--duration", type=float, default=5.0, help="segundos em cada degrau (padrão: 5)")
+    parser.add_argument("--warmup", type=float, default=1.0,
+                        help="segundos rodando o primeiro degrau antes de medir, para encher os caches (padrão: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="semente do gerador de carga")
+    parser.add_argument("--no-render", action="store_true", help="só simula, sem desenhar")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="não mede memória (o tracemalloc deixa tudo bem mais lento)")
+    parser.add_argument("--parallel", type=int, default=0, metavar="N", help="desenha em N faixas (ver asteroides.py)")
+    parser.add_argument("--output", help="arquivo JSON onde salvar o relatório")
+    args = parser.parse_args(argv)
+
+    metas = lista_de_inteiros(args.asteroids)
+    if args.shots is None:
+        tiros = [max(1, meta // ASTEROIDES_POR_TIRO) for meta in metas]
+    else:
+        tiros = lista_de_inteiros(args.shots)
+    if len(tiros) == 1:
+        tiros *= len(metas)
+    if len(tiros) != len(metas):
+        parser.error("--shots precisa ter um valor só ou um por degrau de --asteroids")
+
+    jogo.init(headless=True)
+    jogo.PARALLEL_BANDS = args.parallel
+    jogo.profiler.enabled = True
+    memoria = not args.no_tracemalloc
+    if memoria:
+        tracemalloc.start()
+
+    rng = random.Random(args.seed)
+    # o aquecimento enche os caches (sprites, textos, tabelas), que senão apareceriam como crescimento de memória
+    if args.warmup > 0:
+        rodar_degrau(rng, metas[0], tiros[0], args.warmup, not args.no_render, memoria)
+    degraus = []
+    print(f"{'asteroides':>10s} {'tiros/p':>8s} {'ticks':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'fps':>8s} {'pico KiB':>9s} {'cresc KiB':>9s}")
+    for meta, t in zip(metas, tiros):
+        degrau = rodar_degrau(rng, meta, t, args.duration, not args.no_render, memoria)
+        degraus.append(degrau)
+        q, mem = degrau["frame_ms"], degrau.get("memory")
+        pico = f"{mem['peak_bytes'] / 1024:9.0f}" if mem else f"{'-':>9s}"
+        cresc = f"{mem['growth_bytes'] / 1024:9.1f}" if mem else f"{'-':>9s}"
+        print(f"{meta:10d} {t:8d} {degrau['ticks']:7d} {q['p50']:8.2f} {q['p95']:8.2f} {q['p99']:8.2f} "
+              f"{degrau['fps']:8.1f} {pico} {cresc}")
+        if degrau["game_over_ticks"]:
+            print(f"{'':10s} aviso: {degrau['game_over_ticks']} passos terminaram em colisão com a nave")
+
+    orcamento = 1000 / jogo.FPS
+    knee = joelho(degraus, orcamento)
+    print(f"\njoelho (p95 > {orcamento:.1f} ms): " + (f"{knee} asteroides" if knee is not None else "não atingido"))
+
+    if args.output:
+        relatorio = {
+            "meta": metadados(),
+            "config": {"duration_s": args.duration, "warmup_s": args.warmup, "seed": args.seed, "render": not args.no_render,
+                       "tracemalloc": memoria, "parallel_bands": args.parallel, "frame_budget_ms": orcamento},
+            "knee_asteroids": knee,
+            "steps": degraus,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())